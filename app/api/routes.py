@@ -26,6 +26,7 @@ from app.core.database import (
     query_health_snapshots,
     query_meals,
     get_latest_intake,
+    get_latest_intakes,
     get_latest_health_snapshot,
     get_todays_intakes,
     get_todays_logs,
@@ -33,6 +34,7 @@ from app.core.database import (
     delete_intake,
     delete_subjective_log,
     delete_meal,
+    delete_entries,
     # Water tracking
     insert_water_event,
     query_water_events,
@@ -58,7 +60,7 @@ from app.core.water_engine import (
     compute_daily_goal,
     assess_hydration,
     check_intake_velocity,
-    recent_intake_in_window,
+    recent_intake_windows,
     detect_dehydration_from_vitals,
     hydration_bio_score_modifier,
     generate_hydration_curve,
@@ -106,6 +108,10 @@ class SubjectiveLogRequest(BaseModel):
     timestamp: Optional[str] = None
 
 
+class BulkDeleteRequest(BaseModel):
+    ids: list[int] = Field(..., max_length=500)
+
+
 class HealthSnapshotRequest(BaseModel):
     heart_rate: Optional[float] = None
     resting_hr: Optional[float] = None
@@ -213,6 +219,24 @@ def get_latest_intake_route(substance: str = "elvanse"):
     return {"found": True, **result}
 
 
+@router.get("/intake/latest-batch", dependencies=[Depends(verify_api_key)])
+def get_latest_intakes_route(substances: str = "elvanse,medikinet,medikinet_retard"):
+    """Most recent intake for each of several comma-separated substances, with hours_ago."""
+    latest = get_latest_intakes([s for s in substances.split(",") if s])
+    now = datetime.now()
+    result = {}
+    for substance, row in latest.items():
+        if not row:
+            result[substance] = {"found": False}
+            continue
+        try:
+            hours_ago = round((now - datetime.fromisoformat(row["timestamp"])).total_seconds() / 3600, 2)
+        except (ValueError, TypeError):
+            hours_ago = None
+        result[substance] = {"found": True, **row, "hours_ago": hours_ago}
+    return result
+
+
 @router.get("/log", dependencies=[Depends(verify_api_key)])
 def get_logs(
     start: Optional[str] = None,
@@ -380,6 +404,12 @@ def delete_intake_route(intake_id: int):
     return {"deleted": intake_id, "status": "ok"}
 
 
+@router.post("/intake/delete-batch", dependencies=[Depends(verify_api_key)])
+def delete_intake_batch(req: BulkDeleteRequest):
+    """Delete several intake events by ID in one request."""
+    return {"deleted": delete_entries("intake", req.ids), "status": "ok"}
+
+
 @router.delete("/log/{log_id}", dependencies=[Depends(verify_api_key)])
 def delete_log_route(log_id: int):
     """Delete a subjective log by ID."""
@@ -389,6 +419,12 @@ def delete_log_route(log_id: int):
     return {"deleted": log_id, "status": "ok"}
 
 
+@router.post("/log/delete-batch", dependencies=[Depends(verify_api_key)])
+def delete_log_batch(req: BulkDeleteRequest):
+    """Delete several subjective logs by ID in one request."""
+    return {"deleted": delete_entries("log", req.ids), "status": "ok"}
+
+
 @router.post("/meal", dependencies=[Depends(verify_api_key)])
 def log_meal(req: MealRequest):
     """Log a meal event."""
@@ -423,6 +459,12 @@ def delete_meal_route(meal_id: int):
     return {"deleted": meal_id, "status": "ok"}
 
 
+@router.post("/meal/delete-batch", dependencies=[Depends(verify_api_key)])
+def delete_meal_batch(req: BulkDeleteRequest):
+    """Delete several meal events by ID in one request."""
+    return {"deleted": delete_entries("meal", req.ids), "status": "ok"}
+
+
 @router.get("/status")
 def status():
     """Health check endpoint."""
@@ -572,7 +614,7 @@ async def water_report_endpoint(request: FastAPIRequest):
 
     # Fetch today's water events for velocity + recent-intake checks
     water_events = get_todays_water_events()
-    recent_30 = recent_intake_in_window(water_events, window_minutes=30, now=now)
+    recent_30, recent_60 = recent_intake_windows(water_events, (30, 60), now)
 
     assessment = assess_hydration(
         current_intake_ml=intake,
@@ -582,12 +624,12 @@ async def water_report_endpoint(request: FastAPIRequest):
         recent_intake_30min_ml=recent_30,
     )
 
-    velocity = check_intake_velocity(water_events, now)
+    velocity = check_intake_velocity(water_events, now, last_60min_ml=recent_60)
 
-    message = assessment["message"]
-    priority = assessment["priority"]
-    amount = assessment["recommended_amount"]
-    deadline = assessment["deadline_minutes"]
+    message = assessment.message
+    priority = assessment.priority
+    amount = assessment.recommended_amount
+    deadline = assessment.deadline_minutes
 
     if velocity["alert"]:
         message = velocity["message"]
@@ -678,8 +720,8 @@ async def water_instruction_endpoint(
 
     # Check intake velocity (overhydration protection)
     water_events = get_todays_water_events()
-    velocity = check_intake_velocity(water_events, now)
-    recent_30 = recent_intake_in_window(water_events, window_minutes=30, now=now)
+    recent_30, recent_60 = recent_intake_windows(water_events, (30, 60), now)
+    velocity = check_intake_velocity(water_events, now, last_60min_ml=recent_60)
 
     # Get hydration assessment (with rapid-intake suppression)
     assessment = assess_hydration(
@@ -691,10 +733,10 @@ async def water_instruction_endpoint(
     )
 
     # Override with velocity alert if needed
-    message = assessment["message"]
-    priority = assessment["priority"]
-    amount = assessment["recommended_amount"]
-    deadline = assessment["deadline_minutes"]
+    message = assessment.message
+    priority = assessment.priority
+    amount = assessment.recommended_amount
+    deadline = assessment.deadline_minutes
 
     if velocity["alert"]:
         message = velocity["message"]
@@ -752,8 +794,19 @@ class WaterIntakeRequest(BaseModel):
 
 
 @router.post("/water/intake", dependencies=[Depends(verify_api_key)])
-def log_water_intake(req: WaterIntakeRequest):
-    """Log a water intake event manually or from HA."""
+def log_water_intake(
+    req: WaterIntakeRequest,
+    bootstrap: bool = False,
+    days: int = Query(default=30, ge=1, le=365),
+    goal_days: int = Query(default=7, ge=1, le=90),
+):
+    """
+    Log a water intake event manually or from HA.
+
+    With ?bootstrap=true the response also carries the fresh /water/bootstrap
+    payload (built with `days` / `goal_days`, as on the GET), so the dashboard
+    can redraw without a follow-up GET.
+    """
     row_id = insert_water_event(req.amount_ml, req.source, req.notes, req.timestamp)
 
     # Check velocity after logging
@@ -764,6 +817,8 @@ def log_water_intake(req: WaterIntakeRequest):
     result = {"id": row_id, "amount_ml": req.amount_ml, "status": "ok"}
     if velocity["alert"]:
         result["warning"] = velocity
+    if bootstrap:
+        result["bootstrap"] = _water_bootstrap(days, goal_days, events)
     return result
 
 
@@ -794,6 +849,12 @@ def delete_water_intake(event_id: int):
     return {"deleted": event_id, "status": "ok"}
 
 
+@router.post("/water/intake/delete-batch", dependencies=[Depends(verify_api_key)])
+def delete_water_intake_batch(req: BulkDeleteRequest):
+    """Delete several water intake events by ID in one request."""
+    return {"deleted": delete_entries("water", req.ids), "status": "ok"}
+
+
 @router.delete("/water/intake/last")
 async def delete_last_water_intake(request: FastAPIRequest):
     """
@@ -860,10 +921,14 @@ def water_status_endpoint():
     """
     Full hydration dashboard: goal, intake, assessment, velocity, dehydration.
     """
+    return _water_status(get_todays_water_events())
+
+
+def _water_status(events: list[dict]) -> dict:
+    """Build the /water/status payload from today's already-loaded events."""
     now = datetime.now()
     goal_data = _compute_today_goal()
-    total_ml = get_todays_water_total()
-    events = get_todays_water_events()
+    total_ml = sum(e.get("amount_ml", 0) for e in events)
     last_event = get_last_water_event()
 
     last_drink = None
@@ -873,7 +938,7 @@ def water_status_endpoint():
         except (ValueError, KeyError):
             pass
 
-    recent_30 = recent_intake_in_window(events, window_minutes=30, now=now)
+    recent_30, recent_60 = recent_intake_windows(events, (30, 60), now)
     assessment = assess_hydration(
         current_intake_ml=total_ml,
         goal_ml=goal_data["goal_ml"],
@@ -881,7 +946,7 @@ def water_status_endpoint():
         last_drink_time=last_drink,
         recent_intake_30min_ml=recent_30,
     )
-    velocity = check_intake_velocity(events, now)
+    velocity = check_intake_velocity(events, now, last_60min_ml=recent_60)
 
     # Dehydration detection from vitals
     latest_health = get_latest_health_snapshot()
@@ -900,13 +965,44 @@ def water_status_endpoint():
         "goal": goal_data,
         "intake_ml": total_ml,
         "events_today": len(events),
-        "assessment": assessment,
+        "assessment": assessment._asdict(),
         "velocity": velocity,
         "dehydration": dehydration,
         "weight_kg": _get_effective_weight(),
     }
 
 
+@router.get("/water/bootstrap", dependencies=[Depends(verify_api_key)])
+def water_bootstrap(
+    days: int = Query(default=30, ge=1, le=365),
+    goal_days: int = Query(default=7, ge=1, le=90),
+):
+    """
+    Everything the dashboard Hydration page needs, in one round-trip:
+    status, today's events, pacing curves, goal history and weight.
+    """
+    return _water_bootstrap(days, goal_days, get_todays_water_events())
+
+
+def _water_bootstrap(days: int, goal_days: int, events: list[dict]) -> dict:
+    """Build the /water/bootstrap payload from today's already-loaded events."""
+    now = datetime.now()
+    status = _water_status(events)
+    intake_ml = status["intake_ml"]
+    goal_ml = status["goal"]["goal_ml"]
+    return {
+        "status": status,
+        "intake_today": events,
+        "instruction": {
+            "hydration_curve": generate_hydration_curve(current_intake_ml=intake_ml, goal_ml=goal_ml, now=now),
+            "adaptive_curve": generate_adaptive_curve(current_intake_ml=intake_ml, goal_ml=goal_ml, now=now),
+        },
+        "goal_history": get_water_goal_history(days=goal_days),
+        "weight_latest": get_weight_latest(),
+        "weight_history": get_weight(days=days),
+    }
+
+
 # --- Weight endpoints ---
 
 class WeightRequest(BaseModel):
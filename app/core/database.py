@@ -364,6 +364,20 @@ def get_latest_intake(substance: str) -> Optional[dict]:
         return dict(row) if row else None
 
 
+def get_latest_intakes(substances: list[str]) -> dict[str, Optional[dict]]:
+    """Most recent intake per substance, all on one connection."""
+    latest: dict[str, Optional[dict]] = {}
+    with db_cursor() as cur:
+        for substance in substances:
+            cur.execute(
+                "SELECT * FROM intake_events WHERE substance=? ORDER BY timestamp DESC LIMIT 1",
+                (substance,),
+            )
+            row = cur.fetchone()
+            latest[substance] = dict(row) if row else None
+    return latest
+
+
 def get_latest_health_snapshot() -> Optional[dict]:
     with db_cursor() as cur:
         cur.execute(
@@ -373,14 +387,24 @@ def get_latest_health_snapshot() -> Optional[dict]:
         return dict(row) if row else None
 
 
-def get_todays_intakes() -> list[dict]:
+def _query_today(table: str) -> list[dict]:
+    """Today's rows of `table`, with an extra "hm" (HH:MM) column for list views."""
     today = datetime.now().strftime("%Y-%m-%d")
-    return query_intakes(f"{today}T00:00:00", f"{today}T23:59:59")
+    with db_cursor() as cur:
+        cur.execute(
+            f"SELECT *, substr(timestamp, 12, 5) AS hm FROM {table} "
+            "WHERE timestamp BETWEEN ? AND ? ORDER BY timestamp",
+            (f"{today}T00:00:00", f"{today}T23:59:59"),
+        )
+        return [dict(r) for r in cur.fetchall()]
+
+
+def get_todays_intakes() -> list[dict]:
+    return _query_today("intake_events")
 
 
 def get_todays_logs() -> list[dict]:
-    today = datetime.now().strftime("%Y-%m-%d")
-    return query_subjective_logs(f"{today}T00:00:00", f"{today}T23:59:59")
+    return _query_today("subjective_logs")
 
 
 def delete_intake(intake_id: int) -> bool:
@@ -406,13 +430,7 @@ def insert_meal(meal_type: str, notes: str = "", timestamp: Optional[str] = None
 
 
 def get_todays_meals() -> list[dict]:
-    today = datetime.now().strftime("%Y-%m-%d")
-    with db_cursor() as cur:
-        cur.execute(
-            "SELECT * FROM meal_events WHERE timestamp BETWEEN ? AND ? ORDER BY timestamp",
-            (f"{today}T00:00:00", f"{today}T23:59:59"),
-        )
-        return [dict(r) for r in cur.fetchall()]
+    return _query_today("meal_events")
 
 
 def query_meals(start: str, end: str) -> list[dict]:
@@ -430,6 +448,27 @@ def delete_meal(meal_id: int) -> bool:
         return cur.rowcount > 0
 
 
+# Entry kind -> table, for bulk deletes from the dashboard lists
+ENTRY_TABLES = {
+    "intake": "intake_events",
+    "log": "subjective_logs",
+    "meal": "meal_events",
+    "water": "water_events",
+}
+
+
+def delete_entries(kind: str, ids: list[int]) -> int:
+    """Delete several rows of one entry kind in a single statement. Returns rows deleted."""
+    if not ids:
+        return 0
+    with db_cursor() as cur:
+        cur.execute(
+            f"DELETE FROM {ENTRY_TABLES[kind]} WHERE id IN ({','.join('?' * len(ids))})",
+            ids,
+        )
+        return cur.rowcount
+
+
 # --- Water tracking ---
 
 def insert_water_event(amount_ml: int, source: str = "watch",
@@ -453,8 +492,7 @@ def query_water_events(start: str, end: str) -> list[dict]:
 
 
 def get_todays_water_events() -> list[dict]:
-    today = datetime.now().strftime("%Y-%m-%d")
-    return query_water_events(f"{today}T00:00:00", f"{today}T23:59:59")
+    return _query_today("water_events")
 
 
 def get_todays_water_total() -> int:
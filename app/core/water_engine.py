@@ -25,9 +25,18 @@ Sources:
   Killer et al. (2014), Kamimori et al. (2002)
 """
 
+import bisect
+import functools
 import math
-from datetime import datetime, timedelta, timezone
-from typing import Optional
+import time
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+try:
+    from numba import njit
+except ImportError:  # numba unavailable — run the kernels as plain Python
+    def njit(*args, **kwargs):
+        return lambda fn: fn
 
 from app.config import (
     USER_WEIGHT_KG,
@@ -47,6 +56,43 @@ from app.config import (
 
 # ── Dynamic daily goal ───────────────────────────────────────────────
 
+# Steps are quantised to this bucket before the activity modifier is applied,
+# so the goal only moves every 500 steps (≤30 ml) and stays cacheable.
+GOAL_STEPS_BUCKET = 500
+
+
+class _GoalCore(NamedTuple):
+    goal_ml: int
+    base_ml: int
+    drug_modifier_ml: int
+    fasting_modifier_ml: int
+    activity_modifier_ml: int
+
+
+@functools.lru_cache(maxsize=128)
+def _goal_core(
+    weight_kg: float, is_fasting: bool, elvanse_active: bool, steps_bucket: int,
+) -> _GoalCore:
+    """Compute the TDW components for one input combination. Cached (LRU)."""
+    # Base requirement (weight-scaled)
+    base_ml = weight_kg * WATER_BASE_ML_PER_KG
+
+    # Pharmacological modifier: Elvanse sympathomimetic REE increase
+    drug_mod = WATER_DRUG_MODIFIER_ML if elvanse_active else 0
+
+    # Chrononutritional modifier: OMAD food moisture deficit
+    fasting_mod = WATER_FASTING_MODIFIER_ML if is_fasting else 0
+
+    # Kinematic modifier: activity above sedentary baseline
+    step_surplus = max(0, steps_bucket - WATER_ACTIVITY_BASELINE_STEPS)
+    activity_mod = int(WATER_ACTIVITY_ML_PER_1K_STEPS * (step_surplus / 1000.0))
+
+    # Total
+    goal_ml = int(base_ml + drug_mod + fasting_mod + activity_mod)
+
+    return _GoalCore(goal_ml, int(base_ml), drug_mod, fasting_mod, activity_mod)
+
+
 def compute_daily_goal(
     weight_kg: float = USER_WEIGHT_KG,
     is_fasting: bool = USER_IS_FASTING,
@@ -64,32 +110,22 @@ def compute_daily_goal(
       fasting_mod = +500 ml   (if OMAD / skipping meals)
       activity_mod = 60 × max(0, (steps - 4000) / 1000)
 
+    Steps are rounded down to GOAL_STEPS_BUCKET before the activity
+    modifier is applied; the reported `steps` is the raw value.
+
     Caffeine (Mate) is counted 1:1 — no penalty for habitual users.
 
     Returns dict with goal_ml and breakdown of each modifier.
     """
-    # Base requirement (weight-scaled)
-    base_ml = weight_kg * WATER_BASE_ML_PER_KG
-
-    # Pharmacological modifier: Elvanse sympathomimetic REE increase
-    drug_mod = WATER_DRUG_MODIFIER_ML if elvanse_active else 0
-
-    # Chrononutritional modifier: OMAD food moisture deficit
-    fasting_mod = WATER_FASTING_MODIFIER_ML if is_fasting else 0
-
-    # Kinematic modifier: activity above sedentary baseline
-    step_surplus = max(0, steps - WATER_ACTIVITY_BASELINE_STEPS)
-    activity_mod = int(WATER_ACTIVITY_ML_PER_1K_STEPS * (step_surplus / 1000.0))
-
-    # Total
-    goal_ml = int(base_ml + drug_mod + fasting_mod + activity_mod)
+    steps_bucket = steps // GOAL_STEPS_BUCKET * GOAL_STEPS_BUCKET
+    core = _goal_core(weight_kg, is_fasting, elvanse_active, steps_bucket)
 
     return {
-        "goal_ml": goal_ml,
-        "base_ml": int(base_ml),
-        "drug_modifier_ml": drug_mod,
-        "fasting_modifier_ml": fasting_mod,
-        "activity_modifier_ml": activity_mod,
+        "goal_ml": core.goal_ml,
+        "base_ml": core.base_ml,
+        "drug_modifier_ml": core.drug_modifier_ml,
+        "fasting_modifier_ml": core.fasting_modifier_ml,
+        "activity_modifier_ml": core.activity_modifier_ml,
         "weight_kg": weight_kg,
         "is_fasting": is_fasting,
         "elvanse_active": elvanse_active,
@@ -121,27 +157,71 @@ def expected_intake_at_hour(
 
     For fasting users the same shape applies — OMAD compensation is
     already baked into goal_ml (+500 ml), so the curve shape is the
-    same; only the total is larger.
+    same; only the total is larger.  `is_fasting` is kept for API
+    compatibility only.
 
     Returns expected_ml at the given hour.
     """
-    if hour <= wake_hour:
-        return 0.0
-    if hour >= sleep_hour:
-        return float(goal_ml)
+    return goal_ml * _intake_fraction(float(hour), float(wake_hour), float(sleep_hour))
 
-    waking_total = sleep_hour - wake_hour
-    elapsed = hour - wake_hour
-    t = elapsed / waking_total  # normalised progress 0→1
 
+# Explicit signatures compile eagerly at import (and cache=True reuses the
+# on-disk build), so no request pays the JIT cost.
+@njit("float64(float64, float64, float64)", cache=True, fastmath=True)
+def _intake_fraction(hour, wake_hour, sleep_hour):
+    """Fraction of the daily goal expected by `hour` (front-loaded t^0.85)."""
+    if sleep_hour <= wake_hour:
+        return 0.0 if hour <= wake_hour else 1.0
+
+    # Normalised progress clamped to [0, 1] — before wake → 0, after sleep → goal.
     # Front-loaded power curve: steeper in the morning, gentler in the evening.
-    progress = t ** 0.85
+    t = max(0.0, min(1.0, (hour - wake_hour) / (sleep_hour - wake_hour)))
+    return t ** 0.85
+
+
+# ── Clock context ────────────────────────────────────────────────────
 
-    return goal_ml * progress
+def _now_ctx(now: Optional[datetime] = None) -> tuple[float, float]:
+    """
+    Resolve `now` once into (epoch seconds, local hour of day).
+
+    Without an explicit `now` the clock is read as a float and the hour is
+    derived from the local UTC offset, so the watch-ping path never builds
+    datetime objects.  The hour keeps minute resolution, as before.
+    """
+    if now is not None:
+        return now.timestamp(), now.hour + now.minute / 60.0
+    epoch = time.time()
+    tz_offset = time.localtime(epoch).tm_gmtoff
+    minute_of_day = int((epoch + tz_offset) // 60) % 1440
+    return epoch, minute_of_day / 60.0
 
 
 # ── Hydration status assessment ──────────────────────────────────────
 
+class HydrationResult(NamedTuple):
+    """Outcome of assess_hydration(); use `._asdict()` at the API boundary."""
+    message: str
+    recommended_amount: int
+    priority: str
+    deadline_minutes: int
+    deficit_ml: int
+    pacing_ml_per_hour: int
+    status: str
+    progress_pct: float
+
+
+# Deficit tiers, ascending: a deficit strictly above _DEFICIT_THRESHOLDS[i]
+# triggers _DEFICIT_ACTIONS[i] (highest matching tier wins).
+# Each action: (max amount ml, priority, deadline min, status, message template).
+_DEFICIT_THRESHOLDS = (200, 500, 1000)
+_DEFICIT_ACTIONS = (
+    (300, "normal", 45, "behind", "Etwas im Rückstand ({deficit} ml). Trink {amount} ml."),
+    (400, "high", 30, "behind", "Du bist {deficit} ml im Rückstand. Trink {amount} ml!"),
+    (500, "critical", 20, "critical", "Stark im Rückstand ({deficit} ml)! Trink jetzt {amount} ml."),
+)
+
+
 def assess_hydration(
     current_intake_ml: int,
     goal_ml: int,
@@ -151,11 +231,11 @@ def assess_hydration(
     sleep_hour: float = 23.0,
     is_fasting: bool = USER_IS_FASTING,
     recent_intake_30min_ml: int = 0,
-) -> dict:
+) -> HydrationResult:
     """
     Assess current hydration status and generate a coaching instruction.
 
-    Returns:
+    Returns a HydrationResult with:
       message: str  — text for watch display (German)
       recommended_amount: int — ml to drink now
       priority: str — none/low/normal/high/critical
@@ -163,15 +243,13 @@ def assess_hydration(
       deficit_ml: int  — how far behind schedule
       pacing_ml_per_hour: int
       status: str — on_track / behind / critical / overhydrated / goal_reached
+      progress_pct: float — intake as % of goal
 
     If recent_intake_30min_ml > 500, deficit messages are suppressed because
     the velocity check will handle the warning independently. This prevents
     the "behind schedule" message from appearing immediately after a large intake.
     """
-    if now is None:
-        now = datetime.now()
-
-    hour = now.hour + now.minute / 60.0
+    now_ts, hour = _now_ctx(now)
     expected = expected_intake_at_hour(hour, goal_ml, wake_hour, sleep_hour, is_fasting)
     deficit = int(expected - current_intake_ml)
     pct = (current_intake_ml / goal_ml * 100) if goal_ml > 0 else 0
@@ -202,43 +280,18 @@ def assess_hydration(
         message = ""
         return _build_result(message, amount, priority, deadline, deficit, pacing, status, pct)
 
-    # 2. Critical deficit (>1000ml behind schedule)
-    if deficit > 1000:
-        amount = min(500, deficit)
-        message = f"Stark im Rückstand ({deficit} ml)! Trink jetzt {amount} ml."
-        priority = "critical"
-        deadline = 20
-        status = "critical"
-        return _build_result(message, amount, priority, deadline, deficit, pacing, status, pct)
-
-    # 3. Significant deficit (>500ml behind)
-    if deficit > 500:
-        amount = min(400, deficit)
-        message = f"Du bist {deficit} ml im Rückstand. Trink {amount} ml!"
-        priority = "high"
-        deadline = 30
-        status = "behind"
-        return _build_result(message, amount, priority, deadline, deficit, pacing, status, pct)
-
-    # 4. Moderate deficit (>200ml behind)
-    if deficit > 200:
-        amount = min(300, deficit)
-        message = f"Etwas im Rückstand ({deficit} ml). Trink {amount} ml."
-        priority = "normal"
-        deadline = 45
-        status = "behind"
+    # 2-4. Deficit tiers (>200 / >500 / >1000 ml behind schedule)
+    tier = bisect.bisect_left(_DEFICIT_THRESHOLDS, deficit)
+    if tier > 0:
+        max_amount, priority, deadline, status, template = _DEFICIT_ACTIONS[tier - 1]
+        amount = min(max_amount, deficit)
+        message = template.format_map({"deficit": deficit, "amount": amount})
         return _build_result(message, amount, priority, deadline, deficit, pacing, status, pct)
 
     # 5. Long time since last drink (>120 min)
     if last_drink_time is not None:
-        # ensure both are naive or both are aware
-        if last_drink_time.tzinfo is not None and now.tzinfo is None:
-            now_cmp = now.replace(tzinfo=timezone.utc)
-        elif last_drink_time.tzinfo is None and now.tzinfo is not None:
-            now_cmp = now.replace(tzinfo=None)
-        else:
-            now_cmp = now
-        minutes_since = (now_cmp - last_drink_time).total_seconds() / 60.0
+        # Epoch arithmetic: naive timestamps are local time, aware ones carry their offset
+        minutes_since = (now_ts - last_drink_time.timestamp()) / 60.0
         if minutes_since > 120:
             message = "Über 2 Stunden ohne Wasser — trink etwas!"
             amount = 250
@@ -278,21 +331,66 @@ def assess_hydration(
 def _build_result(
     message: str, amount: int, priority: str, deadline: int,
     deficit: int, pacing: int, status: str, pct: float,
-) -> dict:
-    return {
-        "message": message,
-        "recommended_amount": amount,
-        "priority": priority,
-        "deadline_minutes": deadline,
-        "deficit_ml": deficit,
-        "pacing_ml_per_hour": pacing,
-        "status": status,
-        "progress_pct": round(pct, 1),
-    }
+) -> HydrationResult:
+    return HydrationResult(message, amount, priority, deadline, deficit, pacing, status, round(pct, 1))
 
 
 # ── Recent intake window helper ───────────────────────────────────────
 
+def _event_epoch(ev: dict) -> float:
+    """
+    Epoch seconds of a water event.  Unparseable timestamps give NaN, which
+    fails every window comparison and is therefore skipped.  The event dict
+    is never written to: the same dicts are returned to API clients.
+    """
+    try:
+        return datetime.fromisoformat(ev.get("timestamp", "")).timestamp()
+    except (ValueError, TypeError):
+        return math.nan
+
+
+def recent_intake_windows(
+    water_events: list[dict],
+    windows_minutes: tuple[int, ...] = (30, 60),
+    now: Optional[datetime] = None,
+) -> tuple[int, ...]:
+    """
+    Sum water intake for several trailing windows in a single pass.
+    Returns one ml total per entry of `windows_minutes`, in the same order.
+
+    When `water_events` is in chronological order by epoch (the usual case,
+    ORDER BY timestamp from the database) the scan walks backwards from the
+    newest event and stops at the first one older than the widest window,
+    so the cost stays proportional to the window.  Timestamp strings with
+    mixed UTC offsets can sort differently from their epochs: if the scan
+    meets an out-of-order event, or the first event still falls inside the
+    window, it keeps going over the whole list instead of stopping.
+    """
+    now_ts, _ = _now_ctx(now)
+    cutoffs = [now_ts - minutes * 60.0 for minutes in windows_minutes]
+    oldest = min(cutoffs, default=now_ts)
+    totals = [0] * len(cutoffs)
+    first_ts = _event_epoch(water_events[0]) if water_events else math.nan
+    in_order, newer_ts = True, math.inf
+    for ev in reversed(water_events):
+        ev_ts = _event_epoch(ev)
+        if ev_ts > newer_ts:  # NaN compares False and never breaks the order
+            in_order = False
+        elif ev_ts == ev_ts:
+            newer_ts = ev_ts
+        if ev_ts < oldest:
+            if in_order and not first_ts >= oldest:
+                break
+            continue
+        if not ev_ts <= now_ts:
+            continue
+        amount = ev.get("amount_ml", 0)
+        for i, cutoff in enumerate(cutoffs):
+            if ev_ts >= cutoff:
+                totals[i] += amount
+    return tuple(totals)
+
+
 def recent_intake_in_window(
     water_events: list[dict],
     window_minutes: int = 30,
@@ -300,21 +398,10 @@ def recent_intake_in_window(
 ) -> int:
     """
     Sum water intake in the last `window_minutes` minutes.
+    See recent_intake_windows for the ordering of `water_events`.
     Returns total ml consumed in that window.
     """
-    if now is None:
-        now = datetime.now()
-    cutoff = now - timedelta(minutes=window_minutes)
-    total = 0
-    for ev in water_events:
-        ts = ev.get("timestamp", "")
-        try:
-            ev_time = datetime.fromisoformat(ts)
-        except (ValueError, TypeError):
-            continue
-        if ev_time >= cutoff and ev_time <= now:
-            total += ev.get("amount_ml", 0)
-    return total
+    return recent_intake_windows(water_events, (window_minutes,), now)[0]
 
 
 # ── Intake velocity check (overhydration protection) ─────────────────
@@ -322,6 +409,7 @@ def recent_intake_in_window(
 def check_intake_velocity(
     water_events: list[dict],
     now: Optional[datetime] = None,
+    last_60min_ml: Optional[int] = None,
 ) -> dict:
     """
     Check if intake velocity exceeds the safe renal excretion limit.
@@ -331,22 +419,16 @@ def check_intake_velocity(
       Safety cap: 800 ml/h (hard limit)
       Gastric half-emptying: 13 min, peak absorption: 20 min
 
+    Pass `last_60min_ml` when it was already summed via
+    recent_intake_windows() to skip the scan over `water_events`
+    (which, like there, must be in chronological order).
+
     Returns alert info if velocity exceeded.
     """
-    if now is None:
-        now = datetime.now()
-
     # Sum water intake in the last 60 minutes
-    one_hour_ago = now - timedelta(hours=1)
-    recent_ml = 0
-    for ev in water_events:
-        ts = ev.get("timestamp", "")
-        try:
-            ev_time = datetime.fromisoformat(ts)
-        except (ValueError, TypeError):
-            continue
-        if ev_time >= one_hour_ago and ev_time <= now:
-            recent_ml += ev.get("amount_ml", 0)
+    if last_60min_ml is None:
+        last_60min_ml = recent_intake_in_window(water_events, 60, now)
+    recent_ml = last_60min_ml
 
     alert = recent_ml > WATER_MAX_HOURLY_ML
     return {
@@ -408,6 +490,12 @@ def detect_dehydration_from_vitals(
 
 # ── Hydration Bio-Score modifier ─────────────────────────────────────
 
+# Intake/expected ratio tiers, ascending; a ratio equal to a bound belongs to
+# the tier above it (ratio >= bound), hence bisect_right.
+_RATIO_BINS = (0.4, 0.6, 0.8, 0.95, 1.1)
+_RATIO_SCORES = (-10.0, -8.0, -5.0, 0.0, 3.0, 5.0)
+
+
 def hydration_bio_score_modifier(
     current_intake_ml: int,
     goal_ml: int,
@@ -433,24 +521,11 @@ def hydration_bio_score_modifier(
     if goal_ml <= 0:
         return 0.0
 
-    expected = expected_intake_at_hour(hour, goal_ml, wake_hour, sleep_hour, is_fasting)
+    expected = goal_ml * _intake_fraction(float(hour), float(wake_hour), float(sleep_hour))
     if expected <= 0:
         return 0.0
 
-    ratio = current_intake_ml / expected
-
-    if ratio >= 1.1:
-        return 5.0
-    elif ratio >= 0.95:
-        return 3.0
-    elif ratio >= 0.8:
-        return 0.0
-    elif ratio >= 0.6:
-        return -5.0
-    elif ratio >= 0.4:
-        return -8.0
-    else:
-        return -10.0
+    return _RATIO_SCORES[bisect.bisect_right(_RATIO_BINS, current_intake_ml / expected)]
 
 
 # ── Hydration curve for watch display ─────────────────────────────────
@@ -481,10 +556,7 @@ def generate_hydration_curve(
       - Peak intestinal absorption: ~20 min → 30 min for first meaningful target
       - 45 min + 60 min for mid-range and hourly micro-goals
     """
-    if now is None:
-        now = datetime.now()
-
-    current_hour = now.hour + now.minute / 60.0
+    _, current_hour = _now_ctx(now)
 
     # Generate expected curve points (every 30 min from wake to sleep)
     expected_curve: list[dict] = []
@@ -496,20 +568,35 @@ def generate_hydration_curve(
         expected_ml = expected_intake_at_hour(h, goal_ml, wake_hour, sleep_hour, is_fasting)
         expected_curve.append({"hour": round(h, 2), "ml": int(expected_ml)})
 
+    # Outside the waking window every target clamps to the same end of the
+    # curve (0 before wake, goal after sleep) — skip the per-target evaluation.
+    asleep_ml: Optional[int] = None
+    if wake_hour < sleep_hour:
+        if current_hour >= sleep_hour:
+            asleep_ml = int(goal_ml)
+        elif current_hour + 1.0 <= wake_hour:
+            asleep_ml = 0
+
     # Current expected value
-    current_expected = int(expected_intake_at_hour(
-        current_hour, goal_ml, wake_hour, sleep_hour, is_fasting
-    ))
+    if asleep_ml is not None:
+        current_expected = asleep_ml
+    else:
+        current_expected = int(expected_intake_at_hour(
+            current_hour, goal_ml, wake_hour, sleep_hour, is_fasting
+        ))
 
     # Compute interval targets (15, 30, 45, 60 min ahead)
     targets: list[dict] = []
     for minutes in [15, 30, 45, 60]:
-        target_hour = current_hour + minutes / 60.0
-        if target_hour > sleep_hour:
-            target_hour = sleep_hour
-        target_ml = int(expected_intake_at_hour(
-            target_hour, goal_ml, wake_hour, sleep_hour, is_fasting
-        ))
+        if asleep_ml is not None:
+            target_ml = asleep_ml
+        else:
+            target_hour = current_hour + minutes / 60.0
+            if target_hour > sleep_hour:
+                target_hour = sleep_hour
+            target_ml = int(expected_intake_at_hour(
+                target_hour, goal_ml, wake_hour, sleep_hour, is_fasting
+            ))
         delta_ml = max(0, target_ml - current_intake_ml)
         label = f"{minutes}'" if minutes < 60 else "1h"
         targets.append({
@@ -562,10 +649,7 @@ def generate_adaptive_curve(
     This is the curve that should go to the watch — it shows the user
     a realistic plan, not just the ideal they already missed.
     """
-    if now is None:
-        now = datetime.now()
-
-    current_hour = now.hour + now.minute / 60.0
+    _, current_hour = _now_ctx(now)
     if current_hour < wake_hour:
         current_hour = wake_hour
     if current_hour > sleep_hour:
@@ -5,49 +5,138 @@ Sidebar (Hamburger): Kurven, Vitals, Modell, Korrelation, System.
 Mobile-first, proper German, no emojis.
 """
 
+import atexit
 import math
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 import httpx
-import pandas as pd
-import plotly.graph_objects as go
+import orjson
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import os
 
+# pandas and plotly are imported inside the chart pages only: together they
+# cost several hundred ms at cold start and the Logging page needs neither.
+
 # --- Config ---
 API_BASE = os.getenv("BIO_API_URL", "http://localhost:8000")
 API_KEY = os.getenv("BIO_API_KEY", "")
 HEADERS = {"x-api-key": API_KEY} if API_KEY else {}
 
 
-def api_get(path: str, params: dict | None = None) -> dict | list:
-    try:
-        r = httpx.get(f"{API_BASE}{path}", params=params, headers=HEADERS, timeout=10)
-        r.raise_for_status()
-        return r.json()
-    except Exception as e:
-        st.error(f"API Error: {e}")
-        return {}
+@st.cache_resource
+def _client() -> httpx.Client:
+    """One pooled HTTP/2 client for all sessions — keeps TCP/TLS connections alive across reruns."""
+    client = httpx.Client(
+        base_url=API_BASE,
+        headers=HEADERS,
+        timeout=10,
+        # retries: reconnect (not resend) when a pooled socket was dropped by the server
+        transport=httpx.HTTPTransport(
+            http2=True,
+            retries=2,
+            limits=httpx.Limits(max_keepalive_connections=8),
+        ),
+    )
+    atexit.register(client.close)  # close pooled sockets cleanly on server shutdown
+    return client
+
+
+def _decode(r: httpx.Response) -> dict | list:
+    """Parse a JSON response body with orjson (faster, fewer allocations than r.json())."""
+    return orjson.loads(r.content) if r.content else {}
+
+
+def _api_get_raw(path: str, params: dict | None = None) -> dict | list:
+    r = _client().get(path, params=params)
+    r.raise_for_status()
+    return _decode(r)
+
+
+@st.cache_data(ttl=15, max_entries=256, show_spinner=False)
+def _api_get_cached(path: str, params: tuple | None, day: str) -> dict | list:
+    """
+    GET with a short TTL so widget-driven reruns don't refetch. Errors aren't cached.
+
+    `day` is only part of the cache key: "today" endpoints roll over at midnight.
+    """
+    return _api_get_raw(path, dict(params) if params else None)
+
+
+@st.cache_data(ttl=30, max_entries=16, show_spinner=False)
+def _api_get_status(path: str, params: tuple | None, day: str) -> dict | list:
+    """Sidebar status polls: 30 s, cleared by the sidebar refresh button."""
+    return _api_get_raw(path, dict(params) if params else None)
+
+
+@st.cache_data(ttl=60, max_entries=64, show_spinner=False)
+def _api_get_history(path: str, params: tuple | None, day: str) -> dict | list:
+    """Like _api_get_cached, but for multi-day ranges that change slowly."""
+    return _api_get_raw(path, dict(params) if params else None)
+
+
+# Cached GET per TTL (seconds) — api_get(..., ttl=...) picks one.
+_GET_CACHES = {15: _api_get_cached, 30: _api_get_status, 60: _api_get_history}
 
 
-def api_post(path: str, data: dict) -> dict:
+def _today() -> str:
+    return datetime.now().date().isoformat()
+
+
+def _params_key(params: dict | None) -> tuple | None:
+    """Hashable, order-independent cache key for a query-param dict."""
+    return tuple(sorted(params.items())) if params else None
+
+
+def _invalidate_api_cache() -> None:
+    """Drop cached GETs after a mutation so the follow-up rerun sees it."""
+    for cached in _GET_CACHES.values():
+        cached.clear()
+    st.session_state.pop("_water_boot", None)
+
+
+def api_get(path: str, params: dict | None = None, ttl: int = 15) -> dict | list:
+    """GET through the cache; ttl=60 for day-aligned history ranges."""
     try:
-        r = httpx.post(f"{API_BASE}{path}", json=data, headers=HEADERS, timeout=10)
-        r.raise_for_status()
-        return r.json()
+        return _GET_CACHES[ttl](path, _params_key(params), _today())
     except Exception as e:
         st.error(f"API Error: {e}")
         return {}
 
 
-def api_delete(path: str) -> dict:
+def api_get_many(*requests: tuple[str, dict | None], ttl: int = 15) -> list[dict | list]:
+    """Issue several independent GETs concurrently; results keep request order."""
+    ctx = get_script_run_ctx()
+    cached, day = _GET_CACHES[ttl], _today()
+
+    def _fetch(path: str, params: dict | None) -> dict | list:
+        add_script_run_ctx(ctx=ctx)  # cached calls need the session's script context
+        return cached(path, _params_key(params), day)
+
+    with ThreadPoolExecutor(max_workers=len(requests)) as ex:
+        futures = [ex.submit(_fetch, path, params) for path, params in requests]
+    results: list[dict | list] = []
+    for fut in futures:
+        try:
+            results.append(fut.result())
+        except Exception as e:
+            st.error(f"API Error: {e}")
+            results.append({})
+    return results
+
+
+def api_post(path: str, data: dict, params: dict | None = None) -> dict:
     try:
-        r = httpx.delete(f"{API_BASE}{path}", headers=HEADERS, timeout=10)
+        r = _client().post(path, json=data, params=params)
         r.raise_for_status()
-        return r.json()
+        return _decode(r)
     except Exception as e:
         st.error(f"API Error: {e}")
         return {}
+    finally:
+        _invalidate_api_cache()
 
 
 def _get_dash_weight() -> float:
@@ -68,7 +157,6 @@ PLOTLY_MOBILE_CONFIG = {
 
 PLOTLY_MOBILE_LAYOUT = dict(
     dragmode=False,
-    template="plotly_dark",
     margin=dict(l=40, r=20, t=40, b=35),
     legend=dict(orientation="h", yanchor="bottom", y=1.02),
     xaxis=dict(fixedrange=True),
@@ -76,10 +164,97 @@ PLOTLY_MOBILE_LAYOUT = dict(
 )
 
 
-def mobile_chart(fig, height=350, **kwargs):
-    """Render a Plotly chart with mobile-friendly settings (no accidental zoom/pan)."""
-    fig.update_layout(**PLOTLY_MOBILE_LAYOUT, height=height, **kwargs)
-    st.plotly_chart(fig, use_container_width=True, config=PLOTLY_MOBILE_CONFIG)
+@st.cache_resource
+def _bio_dark_template() -> str:
+    """Register the "bio_dark" template (plotly_dark + PLOTLY_MOBILE_LAYOUT) once per process."""
+    import plotly.graph_objects as go
+    import plotly.io as pio
+
+    tpl = go.layout.Template(pio.templates["plotly_dark"])
+    tpl.layout.update(PLOTLY_MOBILE_LAYOUT)
+    pio.templates["bio_dark"] = tpl
+    return "bio_dark"
+
+
+def mobile_chart(fig, height=350, key: str | None = None, **kwargs):
+    """
+    Render a Plotly chart with mobile-friendly settings (no accidental zoom/pan).
+
+    With a `key` the chart element is stable across reruns and `uirevision`
+    keeps client-side state (legend toggles) when the data changes.
+    """
+    if key:
+        kwargs.setdefault("uirevision", key)
+    fig.update_layout(template=_bio_dark_template(), height=height, **kwargs)
+    st.plotly_chart(fig, use_container_width=True, config=PLOTLY_MOBILE_CONFIG, key=key)
+
+
+# --- Downsampling for dense line traces ---
+LTTB_POINTS = 300
+
+
+def _lttb_xy(x, y, n_out: int = LTTB_POINTS) -> dict:
+    """
+    Largest-Triangle-Three-Buckets downsampling of one line trace.
+
+    Keeps the first and last point and, per bucket, the point spanning the
+    largest triangle with its neighbours — peaks and troughs survive.
+    Returns dict(x=..., y=...) for go.Scattergl(**...); short series pass through.
+    """
+    import numpy as np
+
+    xs, ys = np.asarray(x), np.asarray(y)
+    if ys.dtype.kind != "f":
+        ys = ys.astype(float)  # keep float32 inputs float32 (smaller figure JSON)
+    n = len(xs)
+    if n <= n_out or n_out < 3:
+        return {"x": xs, "y": ys}
+    xf = (xs.astype("datetime64[ns]").astype("int64") if np.issubdtype(xs.dtype, np.datetime64) else xs).astype(float)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)  # n_out - 2 inner buckets
+    idx = np.empty(n_out, dtype=int)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        if b + 2 < len(edges):
+            cx, cy = xf[hi:edges[b + 2]].mean(), ys[hi:edges[b + 2]].mean()
+        else:
+            cx, cy = xf[-1], ys[-1]
+        area = np.abs((xf[a] - cx) * (ys[lo:hi] - ys[a]) - (xf[a] - xf[lo:hi]) * (cy - ys[a]))
+        a = lo + int(np.nan_to_num(area, nan=-1.0).argmax())
+        idx[b + 1] = a
+    return {"x": xs[idx], "y": ys[idx]}
+
+
+def session_line_figure(key: str, x, series: list[tuple[str, object, dict]]):
+    """
+    Line figure kept in st.session_state[key] and reused across reruns.
+
+    `series` is [(name, y, style kwargs)]. If the trace names match the stored
+    figure, only x/y are swapped in place (one batch_update) and extra traces,
+    shapes and annotations added by the caller last time are dropped; otherwise
+    the figure is built fresh. Lines are LTTB-downsampled either way.
+    """
+    import plotly.graph_objects as go
+
+    names = tuple(name for name, _, _ in series)
+    stored = st.session_state.get(key)
+    if stored is not None and stored[0] == names:
+        fig = stored[1]
+        fig.data = fig.data[:len(names)]
+        fig.layout.shapes = ()
+        fig.layout.annotations = ()
+        with fig.batch_update():
+            for tr, (_, y, _) in zip(fig.data, series):
+                tr.update(**_lttb_xy(x, y))
+        return fig
+    fig = go.Figure([
+        go.Scattergl(**_lttb_xy(x, y), mode="lines", name=name, **style)
+        for name, y, style in series
+    ])
+    st.session_state[key] = (names, fig)
+    return fig
 
 
 # --- Page Config ---
@@ -144,8 +319,12 @@ with st.sidebar:
     st.header("Bio-Dashboard")
     sidebar_page = st.radio("Navigation", PAGES, index=0, label_visibility="collapsed")
     st.divider()
+    st.button(
+        "Aktualisieren", key="sb_refresh", use_container_width=True,
+        on_click=_invalidate_api_cache,
+    )
+    bio_sidebar, ws = api_get_many(("/api/bio-score", None), ("/api/water/status", None), ttl=30)
     # Quick Bio-Score
-    bio_sidebar = api_get("/api/bio-score")
     if isinstance(bio_sidebar, dict) and "score" in bio_sidebar:
         sc = bio_sidebar["score"]
         ph = bio_sidebar.get("phase", "?")
@@ -165,7 +344,6 @@ with st.sidebar:
                 "Unter 1.0 = entspannt, 1.0–1.5 = normal, über 1.5 = hohe Belastung."
             )
     # Quick water status
-    ws = api_get("/api/water/status")
     if isinstance(ws, dict) and "intake_ml" in ws:
         goal = ws.get("goal", {}).get("goal_ml", 3200)
         intake = ws.get("intake_ml", 0)
@@ -175,12 +353,388 @@ with st.sidebar:
 current_page = PAGE_MAP.get(sidebar_page, "main")
 
 
+# --- Quick-log buttons (Logging page) ---
+# (label, substance, dose_mg, button type, success message)
+INTAKE_BUTTONS = (
+    ("Elvanse 40mg", "elvanse", 40, "primary", "Elvanse geloggt"),
+    ("Lamate 76mg", "mate", 76, "primary", "Lamate geloggt"),
+    ("Lamate x2", "mate", 152, "secondary", "Doppel-Lamate geloggt"),
+    ("Medikinet 10mg", "medikinet", 10, "secondary", "Medikinet geloggt"),
+)
+# (label, meal_type)
+MEAL_BUTTONS = (
+    ("Mittagessen", "mittagessen"),
+    ("Abendessen", "abendessen"),
+    ("Frühstück", "fruehstueck"),
+    ("Snack", "snack"),
+)
+
+
+def _post_intake(substance: str, dose_mg: float, done_msg: str) -> None:
+    """Button callback: runs before the rerun, so no extra st.rerun() is needed."""
+    r = api_post("/api/intake", {"substance": substance, "dose_mg": dose_mg})
+    if r.get("status") == "ok":
+        st.session_state["_flash"] = done_msg
+
+
+def _post_meal(meal_type: str, label: str) -> None:
+    r = api_post("/api/meal", {"meal_type": meal_type, "notes": st.session_state.get("mnotes", "")})
+    if r.get("status") == "ok":
+        st.session_state["_flash"] = f"{label} geloggt"
+
+
+def _post_backfill_intake() -> None:
+    ss = st.session_state
+    ts = datetime.combine(ss["hdate"], ss["htime"]).isoformat()
+    r = api_post("/api/intake", {"substance": ss["hsub"], "dose_mg": ss["hdose"] or None, "timestamp": ts})
+    if r.get("status") == "ok":
+        ss["_flash"] = "Nachgetragen"
+
+
+def _post_rating() -> None:
+    ss = st.session_state
+    r = api_post("/api/log", {
+        "focus": ss["f"], "mood": ss["m"], "energy": ss["e"],
+        "appetite": ss["a"], "inner_unrest": ss["u"],
+        "tags": ss["tags"],
+    })
+    if r.get("status") == "ok":
+        ss["_flash"] = "Gespeichert"
+
+
+# --- Hydration: quick-add amounts (ml, button type) ---
+WATER_QUICK_ML = ((100, "secondary"), (250, "primary"), (500, "primary"))
+# Ranges for /api/water/bootstrap; also sent with the POST's ?bootstrap=true
+WATER_BOOT_PARAMS = {"days": 30, "goal_days": 7}
+
+
+def _log_water(amount_ml: int) -> None:
+    """Quick-add; keeps the bootstrap the POST returns so the redraw needs no GET."""
+    r = api_post(
+        "/api/water/intake", {"amount_ml": amount_ml},
+        params={"bootstrap": "true", **WATER_BOOT_PARAMS},
+    )
+    if r.get("bootstrap"):
+        # Same lifetime as a cached GET; any other mutation drops it (_invalidate_api_cache)
+        st.session_state["_water_boot"] = (time.monotonic(), r["bootstrap"])
+
+
+# --- Substances: short labels, chart colors, System-page "latest" list ---
+SUBSTANCE_ABBR = {"elvanse": "ELV", "mate": "MAT", "medikinet": "MED", "medikinet_retard": "MR"}
+SUBSTANCE_COLOR = {"elvanse": "#2196F3", "mate": "#FF9800", "medikinet": "#AB47BC", "medikinet_retard": "#7B1FA2"}
+LATEST_SUBSTANCES = (("elvanse", "Elvanse"), ("medikinet", "Medikinet IR"), ("medikinet_retard", "Med. retard"))
+
+
+# --- Vitals: resample rule per resolution choice (None = raw samples) ---
+VITALS_RESOLUTIONS = {"5 min": "5min", "15 min": "15min", "Rohdaten": None}
+
+
+# --- "Heute" list rows (the API adds "hm" = HH:MM to today's rows) ---
+_LOG_ROW = "{hm} F:{focus} M:{mood} E:{energy} A:{appetite} U:{inner_unrest}"
+_LOG_DEFAULTS = {"hm": "", "focus": "?", "mood": "?", "energy": "?", "appetite": "-", "inner_unrest": "-"}
+
+
+def _fmt_log(lg: dict) -> str:
+    return _LOG_ROW.format_map({**_LOG_DEFAULTS, **lg})
+
+
+def _fmt_intake(i: dict) -> str:
+    sub = i.get("substance", "?")
+    return f"{i.get('hm', '')} [{SUBSTANCE_ABBR.get(sub, sub[:3].upper())}] {i.get('dose_mg', '')}mg"
+
+
+def _fmt_meal(meal: dict) -> str:
+    notes = meal.get("notes", "")
+    return f"{meal.get('hm', '')} {meal.get('meal_type', '?')}" + (f" ({notes})" if notes else "")
+
+
+def _fmt_water(ev: dict) -> str:
+    return f"{ev.get('hm', '')}  +{ev.get('amount_ml', 0)} ml  ({ev.get('source', '')})"
+
+
+# Entry kind -> per-resource bulk-delete endpoint
+ENTRY_DELETE_BATCH = {
+    "intake": "/api/intake/delete-batch",
+    "log": "/api/log/delete-batch",
+    "meal": "/api/meal/delete-batch",
+    "water": "/api/water/intake/delete-batch",
+}
+
+
+def _delete_ticked(kind: str, ids: list, editor_key: str) -> None:
+    """Callback: delete the rows ticked in an entry_table with one request."""
+    ss = st.session_state
+    edits = ss[f"{editor_key}_{ss.get(editor_key, 0)}"]["edited_rows"]
+    ticked = [ids[int(row)] for row, change in edits.items() if change.get("X")]
+    if ticked:
+        api_post(ENTRY_DELETE_BATCH[kind], {"ids": ticked})
+        ss[editor_key] = ss.get(editor_key, 0) + 1  # fresh editor, no stale ticks
+
+
+def entry_table(kind: str, rows: list[dict], labels: list[str], key: str) -> None:
+    """
+    Today's entries as plain text; the "Bearbeiten" toggle swaps in a single
+    data_editor with bulk delete. data_editor builds a pandas frame, so the
+    Logging page only pays for pandas while a table is being edited.
+    """
+    if not st.toggle("Bearbeiten", key=f"{key}_edit"):
+        st.text("\n".join(labels))
+        return
+    st.data_editor(
+        {"Eintrag": labels, "X": [False] * len(rows)},
+        key=f"{key}_{st.session_state.get(key, 0)}",
+        disabled=["Eintrag"],
+        hide_index=True,
+        use_container_width=True,
+    )
+    st.button(
+        "Markierte löschen", key=f"{key}_del",
+        on_click=_delete_ticked, args=(kind, [r.get("id") for r in rows], key),
+    )
+
+
+# --- Kurven: PK model explanation (static) ---
+PK_MODEL_MD = """
+**Elvanse (Lisdexamfetamin)** — Drei-Stufen-Kaskadenmodell:
+
+1. **GI-Absorption** — Aufnahme über PEPT1-Transporter im Darm
+2. **Erythrozyten-Hydrolyse** — Enzymatische Spaltung zu d-Amphetamin im Blut
+3. **Elimination** — Renale Ausscheidung von d-Amphetamin
+
+Jede Stufe hat eine eigene Geschwindigkeitskonstante (k_abs, k_hyd, k_e).
+Die Gesamtlösung ist eine 3-Kompartiment-Kaskade:
+
+> A(t) = G₀ · k_abs · k_hyd · Σ[ e^(−rᵢ·t) / Π(rⱼ − rᵢ) ]
+
+Das ergibt eine breitere, flachere Kurve als ein einfaches Bateman-Modell —
+typisch für Elvanse mit dem verzögerten Prodrug-Mechanismus (Tmax ≈ 3.8h statt 1–2h).
+
+---
+
+**Medikinet, Koffein, Co-Dafalgan** — Klassische Bateman-Funktion:
+
+> C(t) = (ka / (ka − ke)) · (e^(−ke·t) − e^(−ka·t))
+
+Normalisiert auf Peak = 1.0. Bei Mehrfacheinnahmen: lineare Superposition.
+
+---
+
+**Allometrische Skalierung** (Gewicht → 70 kg Referenz):
+- Cmax\_user = Cmax\_ref × (70 / Gewicht) — Verteilungsvolumen ∝ Gewicht
+- Clearance = CL\_ref × (Gewicht / 70)^0.75
+
+**ZNS-Belastung** = Summe aller normalisierten Substanz-Level:
+- < 1.0: Entspannt
+- 1.0–1.5: Normaler Arbeitsbereich
+- \> 1.5: Erhöhte Belastung — Unruhe, schneller Puls möglich
+"""
+
+PK_PARAMS = {
+    "Elvanse (Cascade)": {"Modell": "3-Stufen-Kaskade", "k_abs": "0.78 h⁻¹", "k_hyd": "0.78 h⁻¹", "k_e": "0.088 h⁻¹", "Tmax": "≈3.8h", "t½": "≈10h"},
+    "Medikinet IR": {"Modell": "Bateman", "ka": "1.72 h⁻¹", "k_hyd": "—", "k_e": "0.28 h⁻¹", "Tmax": "≈1.5h", "t½": "≈2.5h"},
+    "Med. retard": {"Modell": "Bateman (nüchtern)", "ka": "1.2 h⁻¹", "k_hyd": "—", "k_e": "0.28 h⁻¹", "Tmax": "≈2h", "t½": "≈2.5h"},
+    "Koffein (Mate)": {"Modell": "Bateman", "ka": "2.5 h⁻¹", "k_hyd": "—", "k_e": "0.16 h⁻¹", "Tmax": "≈0.75h", "t½": "≈4.3h"},
+}
+
+
+@st.cache_data(show_spinner=False)
+def _pk_df():
+    """PK parameter table, built once per process."""
+    import pandas as pd
+
+    return pd.DataFrame(PK_PARAMS).T
+
+
+# --- Hydration: charts (rebuilt only when their data changes) ---
+# (column, legend name, color) — stacked under the goal line
+GOAL_BREAKDOWN = (
+    ("base_ml", "Basis", "rgba(79,195,247,0.4)"),
+    ("drug_mod_ml", "Elvanse", "rgba(33,150,243,0.5)"),
+    ("fasting_mod_ml", "OMAD", "rgba(255,152,0,0.5)"),
+    ("activity_mod_ml", "Aktivität", "rgba(76,175,80,0.5)"),
+)
+
+
+@st.cache_data(ttl=300, max_entries=8, show_spinner=False)
+def _goal_history_fig(goal_hist: list[dict]):
+    import pandas as pd
+    import plotly.graph_objects as go
+
+    gdf = pd.DataFrame(goal_hist)
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=gdf["date"], y=gdf["goal_ml"],
+        mode="lines+markers+text",
+        name="Tagesziel",
+        line=dict(color="#4FC3F7", width=3),
+        marker=dict(size=8),
+        text=gdf["goal_ml"].astype(str),
+        textposition="top center",
+        textfont=dict(size=9),
+    ))
+    # Breakdown stacked area
+    for col, name, color in GOAL_BREAKDOWN:
+        if col in gdf.columns:
+            fig.add_trace(go.Bar(x=gdf["date"], y=gdf[col], name=name, marker_color=color))
+    fig.update_layout(
+        title="Tagesbedarf (7 Tage)",
+        yaxis_title="ml",
+        barmode="stack",
+    )
+    return fig
+
+
+@st.cache_data(ttl=300, max_entries=8, show_spinner=False)
+def _weight_fig(history: list[dict]):
+    import pandas as pd
+    import plotly.graph_objects as go
+
+    wdf = pd.DataFrame(history)
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=pd.to_datetime(wdf["timestamp"], format="ISO8601", errors="coerce"), y=wdf["weight_kg"],
+        mode="lines+markers",
+        line=dict(color="#AB47BC", width=2),
+        marker=dict(size=5),
+        name="Gewicht",
+    ))
+    fig.update_layout(
+        title="Gewichtsverlauf (30 Tage)",
+        yaxis_title="kg",
+        xaxis_title="",
+    )
+    return fig
+
+
+PACE_WAKE_H = 7.0
+PACE_SLEEP_H = 23.0
+
+
+@st.cache_data(ttl=300, max_entries=16, show_spinner=False)
+def _pacing_fig(
+    expected: list[dict] | None,
+    events: list[dict],
+    adaptive: list[dict] | None,
+    goal_ml: int,
+):
+    """
+    Soll vs. Ist vs. Catch-Up. `expected`/`adaptive` are the engine's curves.
+    Time-independent, so it caches across reruns; _mark_pacing_now adds "now".
+    """
+    import numpy as np
+    import pandas as pd
+    import plotly.graph_objects as go
+
+    wake_h, sleep_h = PACE_WAKE_H, PACE_SLEEP_H
+
+    # ── Expected (ideal) curve — from API server data ──
+    # Use server's pre-computed expected_curve so dashboard always matches
+    # the engine exactly. Fallback to t^0.65 local computation if offline.
+    if expected:
+        hours_range = [pt["hour"] for pt in expected]
+        expected_curve = [pt["ml"] for pt in expected]
+    else:
+        # Offline fallback — t^0.65 is visibly curved (not t^0.85 which looks linear)
+        hours_range = np.arange(int(wake_h * 2), int(sleep_h * 2) + 1) * 0.5
+        progress = np.clip((hours_range - wake_h) / (sleep_h - wake_h), 0.0, 1.0)
+        expected_curve = (goal_ml * progress ** 0.65).astype(int)
+
+    fig = go.Figure()
+
+    # Expected pacing curve (dashed blue)
+    fig.add_trace(go.Scatter(
+        x=hours_range,
+        y=expected_curve,
+        mode="lines",
+        name="Soll (Ideal)",
+        line=dict(color="#4FC3F7", width=2, dash="dash"),
+        fill="tozeroy",
+        fillcolor="rgba(79, 195, 247, 0.05)",
+    ))
+
+    # Actual intake events as cumulative step line
+    if events:
+        # The API returns today's events ORDER BY timestamp, so no re-sort here
+        edf = pd.DataFrame(events).dropna(subset=["timestamp"])
+        ev_t = pd.to_datetime(edf["timestamp"], format="ISO8601", errors="coerce")
+        edf, ev_t = edf[ev_t.notna()], ev_t[ev_t.notna()]
+        totals = edf["amount_ml"].fillna(0).cumsum().to_numpy()
+        # Start at wake-up with 0 ml; _mark_pacing_now extends it to the current time
+        event_hours = np.concatenate((
+            [wake_h], (ev_t.dt.hour + ev_t.dt.minute / 60.0).to_numpy(),
+        ))
+        event_totals = np.concatenate(([0], totals))
+
+        fig.add_trace(go.Scatter(
+            x=event_hours,
+            y=event_totals,
+            mode="lines+markers",
+            name="Ist (Getrunken)",
+            line=dict(color="#4CAF50", width=3, shape="hv"),
+            marker=dict(size=6),
+        ))
+
+    # Adaptive catch-up curve from API
+    if adaptive:
+        fig.add_trace(go.Scatter(
+            x=[p["hour"] for p in adaptive],
+            y=[p["ml"] for p in adaptive],
+            mode="lines",
+            name="Catch-Up Plan",
+            line=dict(color="#FF9800", width=3),
+        ))
+
+    # Goal line
+    fig.add_hline(
+        y=goal_ml,
+        line=dict(color="#FF9800", width=1, dash="dot"),
+        annotation_text=f"Ziel: {goal_ml} ml",
+        annotation_font=dict(color="#FF9800"),
+    )
+
+    fig.update_layout(
+        title="Trink-Pacing (Ideal vs. Catch-Up vs. Ist)",
+        xaxis_title="Uhrzeit",
+        yaxis_title="ml (kumuliert)",
+        xaxis=dict(
+            tickmode="array",
+            tickvals=list(range(7, 24)),
+            ticktext=[f"{h}:00" for h in range(7, 24)],
+        ),
+    )
+    return fig
+
+
+def _mark_pacing_now(fig, now_h: float):
+    """Extend the Ist line to `now_h` and draw the "Jetzt" marker (on the cached copy)."""
+    for trace in fig.select_traces(selector=dict(name="Ist (Getrunken)")):
+        trace.x = (*trace.x, now_h)
+        trace.y = (*trace.y, trace.y[-1])
+    fig.add_vline(
+        x=now_h,
+        line=dict(color="#F44336", width=2),
+        annotation_text="Jetzt",
+        annotation_font=dict(color="#F44336"),
+    )
+    return fig
+
+
 # =========================================================
 # PAGE: Main Logging (default)
 # =========================================================
 if current_page == "main":
+    reminder, intakes, logs, meals = api_get_many(
+        ("/api/log-reminder", None),
+        ("/api/intake", {"today": True}),
+        ("/api/log", {"today": True}),
+        ("/api/meal", {"today": True}),
+    )
+
+    flash = st.session_state.pop("_flash", None)
+    if flash:
+        st.success(flash)
+
     # --- Log Reminder ---
-    reminder = api_get("/api/log-reminder")
     if isinstance(reminder, dict) and reminder.get("next_due"):
         next_due = reminder["next_due"]
         logs_done = reminder.get("logs_today", 0)
@@ -196,116 +750,68 @@ if current_page == "main":
 
     # ---- SECTION 1: Einnahme ----
     st.subheader("1 — Einnahme")
-    b1, b2 = st.columns(2)
-    with b1:
-        if st.button("Elvanse 40mg", use_container_width=True, type="primary"):
-            r = api_post("/api/intake", {"substance": "elvanse", "dose_mg": 40})
-            if r.get("status") == "ok":
-                st.success("Elvanse geloggt")
-                st.rerun()
-    with b2:
-        if st.button("Lamate 76mg", use_container_width=True, type="primary"):
-            r = api_post("/api/intake", {"substance": "mate", "dose_mg": 76})
-            if r.get("status") == "ok":
-                st.success("Lamate geloggt")
-                st.rerun()
-
-    b3, b4 = st.columns(2)
-    with b3:
-        if st.button("Lamate x2", use_container_width=True):
-            r = api_post("/api/intake", {"substance": "mate", "dose_mg": 152})
-            if r.get("status") == "ok":
-                st.success("Doppel-Lamate geloggt")
-                st.rerun()
-    with b4:
-        if st.button("Medikinet 10mg", use_container_width=True):
-            r = api_post("/api/intake", {"substance": "medikinet", "dose_mg": 10})
-            if r.get("status") == "ok":
-                st.success("Medikinet geloggt")
-                st.rerun()
+    for row in (INTAKE_BUTTONS[:2], INTAKE_BUTTONS[2:]):
+        for col, (label, sub, dose, kind, done_msg) in zip(st.columns(2), row):
+            col.button(
+                label, use_container_width=True, type=kind,
+                on_click=_post_intake, args=(sub, dose, done_msg),
+            )
 
     with st.expander("Nachtragen / Andere"):
-        hc1, hc2 = st.columns(2)
-        with hc1:
-            hist_sub = st.selectbox("Substanz", ["elvanse", "mate", "medikinet", "medikinet_retard", "other"], key="hsub")
-        with hc2:
+        # Substance stays outside the form so its default dose still follows the selection
+        hist_sub = st.selectbox("Substanz", ["elvanse", "mate", "medikinet", "medikinet_retard", "other"], key="hsub")
+        with st.form("backfill_form"):
             dmap = {"elvanse": 40.0, "mate": 76.0, "medikinet": 10.0, "medikinet_retard": 30.0, "other": 0.0}
-            hist_dose = st.number_input("mg", min_value=0.0, step=10.0, value=dmap.get(hist_sub, 0.0), key="hdose")
-        dc1, dc2 = st.columns(2)
-        with dc1:
-            hdate = st.date_input("Datum", value=datetime.now().date(), key="hdate")
-        with dc2:
-            htime = st.time_input("Uhrzeit", value=datetime.now().time().replace(second=0, microsecond=0), key="htime")
-        if st.button("Nachtragen", type="primary", use_container_width=True):
-            ts = datetime.combine(hdate, htime).isoformat()
-            r = api_post("/api/intake", {"substance": hist_sub, "dose_mg": hist_dose or None, "timestamp": ts})
-            if r.get("status") == "ok":
-                st.success("Nachgetragen")
-                st.rerun()
+            st.number_input("mg", min_value=0.0, step=10.0, value=dmap.get(hist_sub, 0.0), key="hdose")
+            dc1, dc2 = st.columns(2)
+            with dc1:
+                st.date_input("Datum", value=datetime.now().date(), key="hdate")
+            with dc2:
+                st.time_input("Uhrzeit", value=datetime.now().time().replace(second=0, microsecond=0), key="htime")
+            st.form_submit_button("Nachtragen", type="primary", use_container_width=True, on_click=_post_backfill_intake)
 
     # ---- SECTION 2: Wie fühlst du dich? ----
     st.divider()
     st.subheader("2 — Wie fühlst du dich?")
 
-    fc1, fc2, fc3 = st.columns(3)
-    with fc1:
-        focus = st.slider("Fokus", 1, 10, 5, key="f")
-    with fc2:
-        mood = st.slider("Laune", 1, 10, 5, key="m")
-    with fc3:
-        energy = st.slider("Energie", 1, 10, 5, key="e")
-
-    fc4, fc5 = st.columns(2)
-    with fc4:
-        appetite = st.slider("Appetit", 1, 10, 5, key="a")
-    with fc5:
-        inner_unrest = st.slider("Innere Unruhe", 1, 10, 1, key="u")
-
-    tag_options = [
-        "migräne", "kopfschmerzen", "übelkeit",
-        "müde", "unruhig", "motiviert",
-        "klar", "brain-fog", "angespannt", "entspannt",
-        "kreativ", "gereizt", "produktiv", "abgelenkt",
-    ]
-    tags = st.multiselect("Tags (optional)", tag_options, key="tags")
-
-    if st.button("Bewertung speichern", type="primary", use_container_width=True):
-        r = api_post("/api/log", {
-            "focus": focus, "mood": mood, "energy": energy,
-            "appetite": appetite, "inner_unrest": inner_unrest,
-            "tags": tags,
-        })
-        if r.get("status") == "ok":
-            st.success("Gespeichert")
-            st.rerun()
+    # Form: dragging a slider no longer reruns the page (and its API calls)
+    with st.form("rating_form", clear_on_submit=True):
+        fc1, fc2, fc3 = st.columns(3)
+        with fc1:
+            st.slider("Fokus", 1, 10, 5, key="f")
+        with fc2:
+            st.slider("Laune", 1, 10, 5, key="m")
+        with fc3:
+            st.slider("Energie", 1, 10, 5, key="e")
+
+        fc4, fc5 = st.columns(2)
+        with fc4:
+            st.slider("Appetit", 1, 10, 5, key="a")
+        with fc5:
+            st.slider("Innere Unruhe", 1, 10, 1, key="u")
+
+        tag_options = [
+            "migräne", "kopfschmerzen", "übelkeit",
+            "müde", "unruhig", "motiviert",
+            "klar", "brain-fog", "angespannt", "entspannt",
+            "kreativ", "gereizt", "produktiv", "abgelenkt",
+        ]
+        st.multiselect("Tags (optional)", tag_options, key="tags")
+
+        st.form_submit_button(
+            "Bewertung speichern", type="primary", use_container_width=True, on_click=_post_rating,
+        )
 
     # ---- SECTION 3: Essen ----
     st.divider()
     st.subheader("3 — Essen")
-    meal_notes = st.text_input("Was? (optional)", key="mnotes", placeholder="Pizza, Salat...")
-    ec1, ec2 = st.columns(2)
-    with ec1:
-        if st.button("Mittagessen", use_container_width=True):
-            r = api_post("/api/meal", {"meal_type": "mittagessen", "notes": meal_notes})
-            if r.get("status") == "ok":
-                st.success("Mittagessen geloggt")
-                st.rerun()
-        if st.button("Frühstück", use_container_width=True):
-            r = api_post("/api/meal", {"meal_type": "fruehstueck", "notes": meal_notes})
-            if r.get("status") == "ok":
-                st.success("Frühstück geloggt")
-                st.rerun()
-    with ec2:
-        if st.button("Abendessen", use_container_width=True):
-            r = api_post("/api/meal", {"meal_type": "abendessen", "notes": meal_notes})
-            if r.get("status") == "ok":
-                st.success("Abendessen geloggt")
-                st.rerun()
-        if st.button("Snack", use_container_width=True):
-            r = api_post("/api/meal", {"meal_type": "snack", "notes": meal_notes})
-            if r.get("status") == "ok":
-                st.success("Snack geloggt")
-                st.rerun()
+    st.text_input("Was? (optional)", key="mnotes", placeholder="Pizza, Salat...")
+    for row in (MEAL_BUTTONS[:2], MEAL_BUTTONS[2:]):
+        for col, (label, meal_type) in zip(st.columns(2), row):
+            col.button(
+                label, use_container_width=True,
+                on_click=_post_meal, args=(meal_type, label),
+            )
 
     # ---- Heutiger Verlauf (kompakt) ----
     st.divider()
@@ -313,73 +819,92 @@ if current_page == "main":
     tc1, tc2 = st.columns(2)
     with tc1:
         st.caption("Einnahmen")
-        intakes = api_get("/api/intake", {"today": True})
         if isinstance(intakes, list) and intakes:
-            for i in intakes:
-                ts = i.get("timestamp", "")[11:16]
-                sub = i.get("substance", "?")
-                dose = i.get("dose_mg", "")
-                lbl = {"elvanse": "ELV", "mate": "MAT", "medikinet": "MED", "medikinet_retard": "MR"}.get(sub, sub[:3].upper())
-                iid = i.get("id")
-                ec, dc = st.columns([5, 1])
-                with ec:
-                    st.text(f"{ts} [{lbl}] {dose}mg")
-                with dc:
-                    if st.button("X", key=f"di_{iid}"):
-                        api_delete(f"/api/intake/{iid}")
-                        st.rerun()
+            entry_table("intake", intakes, [_fmt_intake(i) for i in intakes], "today_intakes")
         else:
             st.caption("—")
 
     with tc2:
         st.caption("Logs")
-        logs = api_get("/api/log", {"today": True})
         if isinstance(logs, list) and logs:
-            for lg in logs:
-                ts = lg.get("timestamp", "")[11:16]
-                lid = lg.get("id")
-                f_val = lg.get("focus", "?")
-                m_val = lg.get("mood", "?")
-                e_val = lg.get("energy", "?")
-                a_val = lg.get("appetite", "-")
-                u_val = lg.get("inner_unrest", "-")
-                ec, dc = st.columns([5, 1])
-                with ec:
-                    st.text(f"{ts} F:{f_val} M:{m_val} E:{e_val} A:{a_val} U:{u_val}")
-                with dc:
-                    if st.button("X", key=f"dl_{lid}"):
-                        api_delete(f"/api/log/{lid}")
-                        st.rerun()
+            entry_table("log", logs, [_fmt_log(lg) for lg in logs], "today_logs")
         else:
             st.caption("—")
 
     # Meals today
-    meals = api_get("/api/meal", {"today": "true"})
     if isinstance(meals, list) and meals:
         st.caption("Mahlzeiten")
-        for meal in meals:
-            ts = meal.get("timestamp", "")[11:16]
-            mt = meal.get("meal_type", "?")
-            mn = meal.get("notes", "")
-            mid = meal.get("id")
-            ns = f" ({mn})" if mn else ""
-            ec, dc = st.columns([5, 1])
-            with ec:
-                st.text(f"{ts} {mt}{ns}")
-            with dc:
-                if st.button("X", key=f"dm_{mid}"):
-                    api_delete(f"/api/meal/{mid}")
-                    st.rerun()
+        entry_table("meal", meals, [_fmt_meal(m) for m in meals], "today_meals")
 
 
 # =========================================================
 # PAGE: Hydration (NEU)
 # =========================================================
 elif current_page == "hydration":
+    # Input panels are fragments: stepping a number_input reruns only the
+    # panel. Saving changes totals and goal, so that still reruns the page.
+    @st.fragment
+    def _water_quick_add() -> None:
+        wa1, wa2, wa3, wa4 = st.columns(4)
+        for col, (ml, kind) in zip((wa1, wa2, wa3), WATER_QUICK_ML):
+            if col.button(f"{ml} ml", use_container_width=True, type=kind):
+                _log_water(ml)
+                st.rerun()
+        with wa4:
+            custom_ml = st.number_input("ml", min_value=25, max_value=1500, value=330, step=25, key="wc_ml", label_visibility="collapsed")
+            if st.button("Log", use_container_width=True, key="wc_log"):
+                _log_water(custom_ml)
+                st.rerun()
+
+    @st.fragment
+    def _weight_entry(current_weight: float) -> None:
+        wc1, wc2 = st.columns(2)
+        with wc1:
+            new_w = st.number_input("Neues Gewicht (kg)", min_value=50.0, max_value=200.0, value=current_weight, step=0.1, key="nw")
+        with wc2:
+            st.write("")
+            st.write("")
+            if st.button("Gewicht speichern", use_container_width=True):
+                api_post("/api/weight", {"weight_kg": new_w})
+                st.rerun()
+
     st.header("Hydration")
 
-    # --- Fetch all water data ---
-    ws = api_get("/api/water/status")
+    # --- Fetch all water data (one bootstrap round-trip) ---
+    seeded = st.session_state.get("_water_boot")
+    if seeded and time.monotonic() - seeded[0] < 15:
+        boot = seeded[1]
+    else:
+        # Probe without api_get: an older API 404s here and the fallback below
+        # is the expected path, not an error worth showing. Any other failure
+        # means the backend itself is down, so don't fan out to it again.
+        try:
+            boot = _GET_CACHES[15]("/api/water/bootstrap", _params_key(WATER_BOOT_PARAMS), _today())
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code not in (404, 405):
+                st.error(f"API Error: {e}")
+                st.stop()
+            boot = {}
+        except Exception as e:
+            st.error(f"API Error: {e}")
+            st.stop()
+    if not isinstance(boot, dict) or not boot:
+        # Older API without /bootstrap: fetch the independent sections concurrently.
+        # (The instruction depends on status, so _boot fetches it on its own.)
+        fallback = {
+            "status": ("/api/water/status", None),
+            "intake_today": ("/api/water/intake", {"today": True}),
+            "goal_history": ("/api/water/goal/history", {"days": 7}),
+            "weight_latest": ("/api/weight/latest", None),
+            "weight_history": ("/api/weight", {"days": 30}),
+        }
+        boot = dict(zip(fallback, api_get_many(*fallback.values())))
+
+    def _boot(key: str, path: str, params: dict | None = None):
+        """Section of the bootstrap payload, or its own endpoint on an older API."""
+        return boot[key] if key in boot else api_get(path, params)
+
+    ws = _boot("status", "/api/water/status")
 
     if isinstance(ws, dict) and "goal" in ws:
         goal_data = ws["goal"]
@@ -410,15 +935,24 @@ elif current_page == "hydration":
             weight = goal_data.get("weight_kg", 96)
             steps = goal_data.get("steps", 0)
 
-            st.markdown(f"""
-| Komponente | Wert |
-|---|---|
-| **Basis** ({weight:.1f} kg × 33.3 ml/kg) | {base} ml |
-| **Elvanse** (+110 ml REE-Steigerung) | {'+' + str(drug) if drug > 0 else '—'} ml |
-| **OMAD-Fasten** (+500 ml Feuchtigkeitsdefizit) | {'+' + str(fasting) if fasting > 0 else '—'} ml |
-| **Aktivität** ({steps} Schritte, +60 ml/1k über 4000) | {'+' + str(activity) if activity > 0 else '—'} ml |
-| **Gesamt** | **{goal_ml} ml** |
-""")
+            st.dataframe(
+                {
+                    "Komponente": [
+                        f"Basis ({weight:.1f} kg × 33.3 ml/kg)",
+                        "Elvanse (+110 ml REE-Steigerung)",
+                        "OMAD-Fasten (+500 ml Feuchtigkeitsdefizit)",
+                        f"Aktivität ({steps} Schritte, +60 ml/1k über 4000)",
+                        "Gesamt",
+                    ],
+                    "Wert": [
+                        f"{base} ml",
+                        *(f"+{v} ml" if v > 0 else "—" for v in (drug, fasting, activity)),
+                        f"{goal_ml} ml",
+                    ],
+                },
+                hide_index=True,
+                use_container_width=True,
+            )
 
         # ---- Coaching / Status ----
         status = assessment.get("status", "on_track")
@@ -457,94 +991,20 @@ elif current_page == "hydration":
 
         now = datetime.now()
         current_hour = now.hour + now.minute / 60.0
-        wake_h = 7.0
-        sleep_h = 23.0
 
         # Fetch instruction from API — contains expected_curve, adaptive_curve
-        instr = api_get("/api/water/instruction", {
+        instr = _boot("instruction", "/api/water/instruction", {
             "current_intake": intake_ml,
             "daily_goal": goal_ml,
         })
 
-        # ── Expected (ideal) curve — from API server data ──
-        # Use server's pre-computed expected_curve so dashboard always matches
-        # the engine exactly. Fallback to t^0.65 local computation if offline.
-        hours_range: list[float] = []
-        expected_curve: list[int] = []
-        hcurve = instr.get("hydration_curve") if isinstance(instr, dict) else None
-        if hcurve and hcurve.get("expected_curve"):
-            for pt in hcurve["expected_curve"]:
-                hours_range.append(pt["hour"])
-                expected_curve.append(pt["ml"])
-        else:
-            # Offline fallback — t^0.65 is visibly curved (not t^0.85 which looks linear)
-            hours_range = [h * 0.5 for h in range(int(wake_h * 2), int(sleep_h * 2) + 1)]
-            for h in hours_range:
-                if h <= wake_h:
-                    expected_curve.append(0)
-                elif h >= sleep_h:
-                    expected_curve.append(goal_ml)
-                else:
-                    t = (h - wake_h) / (sleep_h - wake_h)
-                    expected_curve.append(int(goal_ml * (t ** 0.65)))
-
-        fig_pace = go.Figure()
-
-        # Expected pacing curve (dashed blue)
-        fig_pace.add_trace(go.Scatter(
-            x=hours_range,
-            y=expected_curve,
-            mode="lines",
-            name="Soll (Ideal)",
-            line=dict(color="#4FC3F7", width=2, dash="dash"),
-            fill="tozeroy",
-            fillcolor="rgba(79, 195, 247, 0.05)",
-        ))
-
-        # Actual intake events as cumulative step line
-        events = api_get("/api/water/intake", {"today": "true"})
-        if isinstance(events, list) and events:
-            cumulative = 0
-            event_hours = [wake_h]
-            event_totals = [0]
-            for ev in sorted(events, key=lambda e: e.get("timestamp", "")):
-                ts = ev.get("timestamp", "")
-                try:
-                    t_ev = datetime.fromisoformat(ts)
-                    h = t_ev.hour + t_ev.minute / 60.0
-                except (ValueError, TypeError):
-                    continue
-                cumulative += ev.get("amount_ml", 0)
-                event_hours.append(h)
-                event_totals.append(cumulative)
-            # Extend to current time
-            event_hours.append(current_hour)
-            event_totals.append(cumulative)
-
-            fig_pace.add_trace(go.Scatter(
-                x=event_hours,
-                y=event_totals,
-                mode="lines+markers",
-                name="Ist (Getrunken)",
-                line=dict(color="#4CAF50", width=3, shape="hv"),
-                marker=dict(size=6),
-            ))
+        events = _boot("intake_today", "/api/water/intake", {"today": True})
+        if not isinstance(events, list):
+            events = []
 
         # Adaptive catch-up curve from API
-        if isinstance(instr, dict) and instr.get("adaptive_curve"):
-            ac = instr["adaptive_curve"]
-            ac_curve = ac.get("adaptive_curve", [])
-            if ac_curve:
-                ac_hours = [p["hour"] for p in ac_curve]
-                ac_mls = [p["ml"] for p in ac_curve]
-                fig_pace.add_trace(go.Scatter(
-                    x=ac_hours,
-                    y=ac_mls,
-                    mode="lines",
-                    name="Catch-Up Plan",
-                    line=dict(color="#FF9800", width=3),
-                ))
-
+        ac = instr.get("adaptive_curve") if isinstance(instr, dict) else None
+        if ac:
             # Show catch-up rate info
             rate = ac.get("catch_up_rate_ml_h", 0)
             ac_status = ac.get("status", "on_track")
@@ -560,109 +1020,37 @@ elif current_page == "hydration":
                     f"Defizit: {deficit} ml"
                 )
 
-        # Current time marker
-        fig_pace.add_vline(
-            x=current_hour,
-            line=dict(color="#F44336", width=2),
-            annotation_text="Jetzt",
-            annotation_font=dict(color="#F44336"),
-        )
-
-        # Goal line
-        fig_pace.add_hline(
-            y=goal_ml,
-            line=dict(color="#FF9800", width=1, dash="dot"),
-            annotation_text=f"Ziel: {goal_ml} ml",
-            annotation_font=dict(color="#FF9800"),
-        )
-
-        fig_pace.update_layout(
-            title="Trink-Pacing (Ideal vs. Catch-Up vs. Ist)",
-            xaxis_title="Uhrzeit",
-            yaxis_title="ml (kumuliert)",
-            xaxis=dict(
-                tickmode="array",
-                tickvals=list(range(7, 24)),
-                ticktext=[f"{h}:00" for h in range(7, 24)],
-            ),
-        )
-        mobile_chart(fig_pace, height=400)
+        if not events:
+            # Empty morning: nothing to compare yet, skip building the chart
+            st.caption("Noch keine Wasser-Einträge heute — tippe unten auf 250 ml.")
+        else:
+            hcurve = instr.get("hydration_curve") if isinstance(instr, dict) else None
+            fig_pace = _pacing_fig(
+                (hcurve or {}).get("expected_curve"),
+                events,
+                (ac or {}).get("adaptive_curve"),
+                goal_ml,
+            )
+            mobile_chart(_mark_pacing_now(fig_pace, current_hour), height=400, key="hydration_pace")
 
         # ---- Goal History (Tagesbedarf-Veränderung) ----
         st.divider()
         st.subheader("Tagesbedarf-Verlauf")
         st.caption("Wie sich dein Tagesbedarf über die letzten 7 Tage verändert hat.")
-        goal_hist = api_get("/api/water/goal/history", {"days": 7})
+        goal_hist = _boot("goal_history", "/api/water/goal/history", {"days": 7})
         if isinstance(goal_hist, list) and goal_hist:
-            gdf = pd.DataFrame(goal_hist)
-            fig_goal = go.Figure()
-
-            fig_goal.add_trace(go.Scatter(
-                x=gdf["date"], y=gdf["goal_ml"],
-                mode="lines+markers+text",
-                name="Tagesziel",
-                line=dict(color="#4FC3F7", width=3),
-                marker=dict(size=8),
-                text=[f"{g}" for g in gdf["goal_ml"]],
-                textposition="top center",
-                textfont=dict(size=9),
-            ))
-
-            # Breakdown stacked area
-            if "base_ml" in gdf.columns:
-                fig_goal.add_trace(go.Bar(
-                    x=gdf["date"], y=gdf.get("base_ml", []),
-                    name="Basis", marker_color="rgba(79,195,247,0.4)",
-                ))
-            if "drug_mod_ml" in gdf.columns:
-                fig_goal.add_trace(go.Bar(
-                    x=gdf["date"], y=gdf.get("drug_mod_ml", []),
-                    name="Elvanse", marker_color="rgba(33,150,243,0.5)",
-                ))
-            if "fasting_mod_ml" in gdf.columns:
-                fig_goal.add_trace(go.Bar(
-                    x=gdf["date"], y=gdf.get("fasting_mod_ml", []),
-                    name="OMAD", marker_color="rgba(255,152,0,0.5)",
-                ))
-            if "activity_mod_ml" in gdf.columns:
-                fig_goal.add_trace(go.Bar(
-                    x=gdf["date"], y=gdf.get("activity_mod_ml", []),
-                    name="Aktivität", marker_color="rgba(76,175,80,0.5)",
-                ))
-
-            fig_goal.update_layout(
-                title="Tagesbedarf (7 Tage)",
-                yaxis_title="ml",
-                barmode="stack",
-            )
-            mobile_chart(fig_goal, height=320)
+            fig_goal = _goal_history_fig(goal_hist)
+            mobile_chart(fig_goal, height=320, key="hydration_goal")
         else:
             st.caption("Noch keine Ziel-Historie vorhanden.")
 
         # ---- Quick-Add Wasser ----
         st.divider()
         st.subheader("Wasser loggen")
-        wa1, wa2, wa3, wa4 = st.columns(4)
-        with wa1:
-            if st.button("100 ml", use_container_width=True):
-                api_post("/api/water/intake", {"amount_ml": 100})
-                st.rerun()
-        with wa2:
-            if st.button("250 ml", use_container_width=True, type="primary"):
-                api_post("/api/water/intake", {"amount_ml": 250})
-                st.rerun()
-        with wa3:
-            if st.button("500 ml", use_container_width=True, type="primary"):
-                api_post("/api/water/intake", {"amount_ml": 500})
-                st.rerun()
-        with wa4:
-            custom_ml = st.number_input("ml", min_value=25, max_value=1500, value=330, step=25, key="wc_ml", label_visibility="collapsed")
-            if st.button("Log", use_container_width=True, key="wc_log"):
-                api_post("/api/water/intake", {"amount_ml": custom_ml})
-                st.rerun()
+        _water_quick_add()
 
         # ---- Historical water entry ----
-        with st.expander("Wasser nachtragen (historisch)"):
+        with st.expander("Wasser nachtragen (historisch)"), st.form("hw_form"):
             hw1, hw2 = st.columns(2)
             with hw1:
                 hist_w_date = st.date_input("Datum", value=datetime.now().date(), key="hw_date")
@@ -674,7 +1062,7 @@ elif current_page == "hydration":
             with hw4:
                 hist_w_src = st.selectbox("Quelle", ["manual", "watch", "ha"], key="hw_src")
             hist_w_notes = st.text_input("Notizen (optional)", key="hw_notes", placeholder="z.B. Tee, Suppe...")
-            if st.button("Nachtragen", type="primary", use_container_width=True, key="hw_submit"):
+            if st.form_submit_button("Nachtragen", type="primary", use_container_width=True):
                 ts = datetime.combine(hist_w_date, hist_w_time).isoformat()
                 r = api_post("/api/water/intake", {
                     "amount_ml": hist_w_ml,
@@ -695,25 +1083,15 @@ elif current_page == "hydration":
                 st.rerun()
 
         # ---- Heutige Einträge ----
-        if isinstance(events, list) and events:
+        if events:
             with st.expander(f"Heutige Einträge ({len(events)})"):
-                for ev in reversed(events):
-                    ts = ev.get("timestamp", "")[11:16]
-                    ml = ev.get("amount_ml", 0)
-                    src = ev.get("source", "")
-                    eid = ev.get("id")
-                    ec, dc = st.columns([5, 1])
-                    with ec:
-                        st.text(f"{ts}  +{ml} ml  ({src})")
-                    with dc:
-                        if st.button("X", key=f"dw_{eid}"):
-                            api_delete(f"/api/water/intake/{eid}")
-                            st.rerun()
+                newest_first = events[::-1]
+                entry_table("water", newest_first, [_fmt_water(ev) for ev in newest_first], "today_water")
 
         # ---- Gewicht ----
         st.divider()
         st.subheader("Gewicht")
-        weight_data = api_get("/api/weight/latest")
+        weight_data = _boot("weight_latest", "/api/weight/latest")
         current_weight = 96.0
         weight_source = "config"
         if isinstance(weight_data, dict) and weight_data.get("found"):
@@ -728,37 +1106,13 @@ elif current_page == "hydration":
             st.caption("Quelle: Standardwert (kein Gewicht in DB)")
 
         # Weight chart (last 30 days)
-        weight_history = api_get("/api/weight", {"days": 30})
+        weight_history = _boot("weight_history", "/api/weight", {"days": 30})
         if isinstance(weight_history, dict) and weight_history.get("history"):
             wh = weight_history["history"]
             if len(wh) > 1:
-                wdf = pd.DataFrame(wh)
-                wdf["time"] = pd.to_datetime(wdf["timestamp"])
-                fig_w = go.Figure()
-                fig_w.add_trace(go.Scatter(
-                    x=wdf["time"], y=wdf["weight_kg"],
-                    mode="lines+markers",
-                    line=dict(color="#AB47BC", width=2),
-                    marker=dict(size=5),
-                    name="Gewicht",
-                ))
-                fig_w.update_layout(
-                    title="Gewichtsverlauf (30 Tage)",
-                    yaxis_title="kg",
-                    xaxis_title="",
-                )
-                mobile_chart(fig_w, height=250)
+                mobile_chart(_weight_fig(wh), height=250, key="hydration_weight")
 
-        wc1, wc2 = st.columns(2)
-        with wc1:
-            new_w = st.number_input("Neues Gewicht (kg)", min_value=50.0, max_value=200.0, value=current_weight, step=0.1, key="nw")
-        with wc2:
-            st.write("")
-            st.write("")
-            if st.button("Gewicht speichern", use_container_width=True):
-                api_post("/api/weight", {"weight_kg": new_w})
-                st.success(f"Gewicht {new_w} kg gespeichert")
-                st.rerun()
+        _weight_entry(current_weight)
     else:
         st.warning("Keine Wasser-Daten verfügbar. Ist das Bio-Dashboard API erreichbar?")
 
@@ -767,547 +1121,569 @@ elif current_page == "hydration":
 # PAGE: Kurven & Timeline
 # =========================================================
 elif current_page == "kurven":
-    st.header("Kurven & Timeline")
-
-    date = st.date_input("Datum", value=datetime.now().date(), key="tl_date")
-    date_str = date.isoformat()
-
-    curve_data = api_get("/api/bio-score/curve", {"date": date_str, "interval": 15})
-
-    if isinstance(curve_data, dict) and "points" in curve_data:
-        points = curve_data["points"]
-        df = pd.DataFrame(points)
-
-        if not df.empty:
-            df["time"] = pd.to_datetime(df["timestamp"])
-            is_today = date == datetime.now().date()
-
-            # -- Bio-Score + Substanz-Kurven --
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=df["time"], y=df["score"],
-                mode="lines", name="Bio-Score",
-                line=dict(color="#4CAF50", width=3),
-                fill="tozeroy", fillcolor="rgba(76,175,80,0.08)",
-            ))
-            fig.add_trace(go.Scatter(
-                x=df["time"], y=df["circadian"],
-                mode="lines", name="Circadian",
-                line=dict(color="#9E9E9E", width=1, dash="dot"),
-            ))
-            fig.add_trace(go.Scatter(
-                x=df["time"], y=df["elvanse_boost"],
-                mode="lines", name="Elvanse",
-                line=dict(color="#2196F3", width=2),
-            ))
-            if "medikinet_boost" in df.columns:
-                fig.add_trace(go.Scatter(
-                    x=df["time"], y=df["medikinet_boost"],
-                    mode="lines", name="Medikinet",
-                    line=dict(color="#AB47BC", width=2),
-                ))
-            fig.add_trace(go.Scatter(
-                x=df["time"], y=df["caffeine_boost"],
-                mode="lines", name="Koffein",
-                line=dict(color="#FF9800", width=2),
-            ))
-
-            def _vmark(fig_ref, x, color, dash, w, text, anchor="left"):
-                fig_ref.add_shape(
-                    type="line", x0=x, x1=x, y0=0, y1=1,
-                    yref="paper", line=dict(color=color, width=w, dash=dash),
-                )
-                fig_ref.add_annotation(
-                    x=x, y=1, yref="paper", text=text,
-                    showarrow=False, font=dict(color=color, size=9),
-                    xanchor=anchor, yanchor="bottom",
-                )
+    # Each analysis page is a fragment: its own widgets rerun only the page,
+    # not the sidebar status calls or the rest of the script.
+    @st.fragment
+    def _kurven_page() -> None:
+        import numpy as np
+        import pandas as pd
+        import plotly.graph_objects as go
+
+        st.header("Kurven & Timeline")
+
+        date = st.date_input("Datum", value=datetime.now().date(), key="tl_date")
+        date_str = date.isoformat()
+
+        day_range = {"start": f"{date_str}T00:00:00", "end": f"{date_str}T23:59:59"}
+        # Past days don't change: keep them in the 60 s history cache
+        curve_data, day_intakes, day_logs = api_get_many(
+            ("/api/bio-score/curve", {"date": date_str, "interval": 15}),
+            ("/api/intake", day_range),
+            ("/api/log", day_range),
+            ttl=15 if date == datetime.now().date() else 60,
+        )
 
-            if is_today:
-                _vmark(fig, datetime.now(), "#F44336", "solid", 2, "Jetzt")
-
-            # Intake markers
-            day_intakes = api_get("/api/intake", {"start": f"{date_str}T00:00:00", "end": f"{date_str}T23:59:59"})
-            if isinstance(day_intakes, list):
-                cmap = {"elvanse": "#2196F3", "mate": "#FF9800", "medikinet": "#AB47BC", "medikinet_retard": "#7B1FA2"}
-                lmap = {"elvanse": "ELV", "mate": "MAT", "medikinet": "MED", "medikinet_retard": "MR"}
-                for itk in day_intakes:
-                    t = itk["timestamp"]
-                    s = itk.get("substance", "?")
-                    d = itk.get("dose_mg", "")
-                    _vmark(fig, t, cmap.get(s, "#9C27B0"), "dash", 1, f"{lmap.get(s, s[:3])} {d}mg")
-
-            # Fokus diamonds
-            day_logs = api_get("/api/log", {"start": f"{date_str}T00:00:00", "end": f"{date_str}T23:59:59"})
-            if isinstance(day_logs, list):
-                for lg in day_logs:
-                    t = pd.to_datetime(lg["timestamp"])
-                    foc = lg.get("focus", 5)
-                    fig.add_trace(go.Scatter(
-                        x=[t], y=[foc * 10], mode="markers",
+        if isinstance(curve_data, dict) and "points" in curve_data:
+            points = curve_data["points"]
+
+            if points:
+                # Pull only the plotted keys into arrays — no DataFrame of every field.
+                # float32 / second resolution: orjson writes both more compactly
+                # into the figure JSON than float64 / nanosecond timestamps.
+                curve_t = pd.to_datetime([p["timestamp"] for p in points], format="ISO8601").as_unit("s")
+                cols = points[0].keys()
+
+                def col(name):
+                    return np.array([p.get(name) for p in points], dtype=np.float32)
+
+                is_today = date == datetime.now().date()
+
+                # -- Bio-Score + Substanz-Kurven --
+                boost = [
+                    ("Bio-Score", col("score"), dict(
+                        line=dict(color="#4CAF50", width=3),
+                        fill="tozeroy", fillcolor="rgba(76,175,80,0.08)",
+                    )),
+                    ("Circadian", col("circadian"), dict(line=dict(color="#9E9E9E", width=1, dash="dot"))),
+                    ("Elvanse", col("elvanse_boost"), dict(line=dict(color="#2196F3", width=2))),
+                ]
+                if "medikinet_boost" in cols:
+                    boost.append(("Medikinet", col("medikinet_boost"), dict(line=dict(color="#AB47BC", width=2))))
+                boost.append(("Koffein", col("caffeine_boost"), dict(line=dict(color="#FF9800", width=2))))
+                fig = session_line_figure("kurven_fig", curve_t, boost)
+
+                def _vmark(x, color, dash, w, text, anchor="left"):
+                    """Vertical marker: (shape, annotation) layout dicts for one time point."""
+                    return (
+                        dict(
+                            type="line", x0=x, x1=x, y0=0, y1=1,
+                            yref="paper", line=dict(color=color, width=w, dash=dash),
+                        ),
+                        dict(
+                            x=x, y=1, yref="paper", text=text,
+                            showarrow=False, font=dict(color=color, size=9),
+                            xanchor=anchor, yanchor="bottom",
+                        ),
+                    )
+
+                # Collect all vertical markers and set them in one layout update
+                # instead of one add_shape/add_annotation pair per intake.
+                marks = []
+                if is_today:
+                    marks.append(_vmark(datetime.now(), "#F44336", "solid", 2, "Jetzt"))
+
+                # Intake markers
+                if isinstance(day_intakes, list) and day_intakes:
+                    # Colors/labels mapped per distinct substance, not per intake
+                    subs = pd.Series([itk.get("substance", "?") for itk in day_intakes], dtype="category")
+                    colors = subs.map(SUBSTANCE_COLOR).astype(object).fillna("#9C27B0")
+                    abbrs = subs.map(SUBSTANCE_ABBR).astype(object).fillna(subs.astype(str).str[:3])
+                    for itk, color, abbr in zip(day_intakes, colors, abbrs):
+                        marks.append(_vmark(
+                            itk["timestamp"], color, "dash", 1, f"{abbr} {itk.get('dose_mg', '')}mg",
+                        ))
+                if marks:
+                    shapes, annots = zip(*marks)
+                    fig.update_layout(shapes=shapes, annotations=annots)
+
+                # Fokus diamonds — one marker trace for all logs
+                if isinstance(day_logs, list) and day_logs:
+                    focs = [lg.get("focus", 5) for lg in day_logs]
+                    fig.add_trace(go.Scattergl(
+                        x=pd.to_datetime([lg["timestamp"] for lg in day_logs], format="ISO8601").as_unit("s"),
+                        y=[foc * 10 for foc in focs], mode="markers",
                         marker=dict(size=12, color="#E91E63", symbol="diamond"),
-                        showlegend=False, hovertext=f"Fokus: {foc}/10",
+                        showlegend=False, hoverinfo="text",
+                        hovertext=[f"Fokus: {foc}/10" for foc in focs],
                     ))
 
-            fig.update_layout(
-                title=f"Tagesverlauf — {date_str}",
-                xaxis_title="Uhrzeit", yaxis_title="Score / Boost",
-                yaxis=dict(range=[0, 105]),
-            )
-            mobile_chart(fig, height=420)
-
-            # -- Substanz-Level + ZNS-Last --
-            st.subheader("Substanz-Level & ZNS-Belastung")
-            st.caption(
-                "Normalisierte Wirkstoff-Level (0–1). "
-                "ZNS-Belastung = Summe aller aktiven Substanzen. "
-                "Über 1.5 = erhöhte ZNS-Belastung (Unruhe, Herzrasen möglich)."
-            )
-            fig2 = go.Figure()
-            fig2.add_trace(go.Scatter(
-                x=df["time"], y=df["elvanse_level"],
-                mode="lines", name="Elvanse",
-                line=dict(color="#2196F3", width=2),
-            ))
-            if "medikinet_level" in df.columns:
-                fig2.add_trace(go.Scatter(
-                    x=df["time"], y=df["medikinet_level"],
-                    mode="lines", name="Medikinet",
-                    line=dict(color="#AB47BC", width=2),
-                ))
-            fig2.add_trace(go.Scatter(
-                x=df["time"], y=df["caffeine_level"],
-                mode="lines", name="Koffein",
-                line=dict(color="#FF9800", width=2),
-            ))
-            if "cns_load" in df.columns:
-                fig2.add_trace(go.Scatter(
-                    x=df["time"], y=df["cns_load"],
-                    mode="lines", name="ZNS-Belastung",
-                    line=dict(color="#F44336", width=3, dash="dash"),
-                    fill="tozeroy", fillcolor="rgba(244,67,54,0.06)",
-                ))
-                fig2.add_hline(
-                    y=1.5, line=dict(color="#FFC107", width=1, dash="dot"),
-                    annotation_text="Warnschwelle 1.5",
+                fig.update_layout(
+                    title=f"Tagesverlauf — {date_str}",
+                    xaxis_title="Uhrzeit", yaxis_title="Score / Boost",
+                    yaxis=dict(range=[0, 105]),
                 )
+                mobile_chart(fig, height=420, key="kurven_chart")
+
+                # -- Substanz-Level + ZNS-Last --
+                st.subheader("Substanz-Level & ZNS-Belastung")
+                st.caption(
+                    "Normalisierte Wirkstoff-Level (0–1). "
+                    "ZNS-Belastung = Summe aller aktiven Substanzen. "
+                    "Über 1.5 = erhöhte ZNS-Belastung (Unruhe, Herzrasen möglich)."
+                )
+                levels = [("Elvanse", col("elvanse_level"), dict(line=dict(color="#2196F3", width=2)))]
+                if "medikinet_level" in cols:
+                    levels.append(("Medikinet", col("medikinet_level"), dict(line=dict(color="#AB47BC", width=2))))
+                levels.append(("Koffein", col("caffeine_level"), dict(line=dict(color="#FF9800", width=2))))
+                if "cns_load" in cols:
+                    levels.append(("ZNS-Belastung", col("cns_load"), dict(
+                        line=dict(color="#F44336", width=3, dash="dash"),
+                        fill="tozeroy", fillcolor="rgba(244,67,54,0.06)",
+                    )))
+                fig2 = session_line_figure("kurven_fig2", curve_t, levels)
+                marks2 = []
+                if "cns_load" in cols:
+                    # Horizontal warning line, same look as add_hline(annotation_text=...)
+                    marks2.append((
+                        dict(
+                            type="line", xref="paper", x0=0, x1=1, y0=1.5, y1=1.5,
+                            line=dict(color="#FFC107", width=1, dash="dot"),
+                        ),
+                        dict(
+                            xref="paper", x=1, y=1.5, text="Warnschwelle 1.5",
+                            showarrow=False, xanchor="right", yanchor="bottom",
+                        ),
+                    ))
+                if is_today:
+                    marks2.append(_vmark(datetime.now(), "#F44336", "solid", 1, "Jetzt"))
+                shapes2, annots2 = zip(*marks2) if marks2 else ((), ())
+
+                fig2.update_layout(
+                    xaxis_title="Uhrzeit", yaxis_title="Level (0–1) / ZNS",
+                    yaxis=dict(range=[0, 2.5]),
+                    shapes=shapes2, annotations=annots2,
+                )
+                mobile_chart(fig2, height=350, key="kurven_chart2")
+            else:
+                st.info("Keine Daten")
 
-            if is_today:
-                _vmark(fig2, datetime.now(), "#F44336", "solid", 1, "Jetzt")
-
-            fig2.update_layout(
-                xaxis_title="Uhrzeit", yaxis_title="Level (0–1) / ZNS",
-                yaxis=dict(range=[0, 2.5]),
-            )
-            mobile_chart(fig2, height=350)
-        else:
-            st.info("Keine Daten")
-
-    # PK-Erklärung (aktualisiert für 3-Stage Cascade)
-    st.divider()
-    st.subheader("So funktioniert das Modell")
-    st.markdown("""
-**Elvanse (Lisdexamfetamin)** — Drei-Stufen-Kaskadenmodell:
-
-1. **GI-Absorption** — Aufnahme über PEPT1-Transporter im Darm
-2. **Erythrozyten-Hydrolyse** — Enzymatische Spaltung zu d-Amphetamin im Blut
-3. **Elimination** — Renale Ausscheidung von d-Amphetamin
-
-Jede Stufe hat eine eigene Geschwindigkeitskonstante (k_abs, k_hyd, k_e).
-Die Gesamtlösung ist eine 3-Kompartiment-Kaskade:
-
-> A(t) = G₀ · k_abs · k_hyd · Σ[ e^(−rᵢ·t) / Π(rⱼ − rᵢ) ]
-
-Das ergibt eine breitere, flachere Kurve als ein einfaches Bateman-Modell —
-typisch für Elvanse mit dem verzögerten Prodrug-Mechanismus (Tmax ≈ 3.8h statt 1–2h).
-
----
-
-**Medikinet, Koffein, Co-Dafalgan** — Klassische Bateman-Funktion:
-
-> C(t) = (ka / (ka − ke)) · (e^(−ke·t) − e^(−ka·t))
-
-Normalisiert auf Peak = 1.0. Bei Mehrfacheinnahmen: lineare Superposition.
-
----
-
-**Allometrische Skalierung** (Gewicht → 70 kg Referenz):
-- Cmax\_user = Cmax\_ref × (70 / Gewicht) — Verteilungsvolumen ∝ Gewicht
-- Clearance = CL\_ref × (Gewicht / 70)^0.75
-
-**ZNS-Belastung** = Summe aller normalisierten Substanz-Level:
-- < 1.0: Entspannt
-- 1.0–1.5: Normaler Arbeitsbereich
-- \> 1.5: Erhöhte Belastung — Unruhe, schneller Puls möglich
-""")
+        # PK-Erklärung (aktualisiert für 3-Stage Cascade) — collapsed, so the
+        # browser only lays it out on demand
+        st.divider()
+        with st.expander("So funktioniert das Modell"):
+            st.markdown(PK_MODEL_MD)
+            st.dataframe(_pk_df(), use_container_width=True)
 
-    pk_data = {
-        "Elvanse (Cascade)": {"Modell": "3-Stufen-Kaskade", "k_abs": "0.78 h⁻¹", "k_hyd": "0.78 h⁻¹", "k_e": "0.088 h⁻¹", "Tmax": "≈3.8h", "t½": "≈10h"},
-        "Medikinet IR": {"Modell": "Bateman", "ka": "1.72 h⁻¹", "k_hyd": "—", "k_e": "0.28 h⁻¹", "Tmax": "≈1.5h", "t½": "≈2.5h"},
-        "Med. retard": {"Modell": "Bateman (nüchtern)", "ka": "1.2 h⁻¹", "k_hyd": "—", "k_e": "0.28 h⁻¹", "Tmax": "≈2h", "t½": "≈2.5h"},
-        "Koffein (Mate)": {"Modell": "Bateman", "ka": "2.5 h⁻¹", "k_hyd": "—", "k_e": "0.16 h⁻¹", "Tmax": "≈0.75h", "t½": "≈4.3h"},
-    }
-    st.dataframe(pd.DataFrame(pk_data).T, use_container_width=True)
+    _kurven_page()
 
 
 # =========================================================
 # PAGE: Vitals & Health
 # =========================================================
 elif current_page == "vitals":
-    st.header("Vitals & Health")
-
-    # Latest snapshot
-    latest_h = api_get("/api/health/latest")
-    if isinstance(latest_h, dict) and latest_h.get("found"):
-        v1, v2, v3, v4 = st.columns(4)
-        hr = latest_h.get("heart_rate")
-        rhr = latest_h.get("resting_hr")
-        hrv = latest_h.get("hrv")
-        sleep_dur = latest_h.get("sleep_duration")
-        spo2 = latest_h.get("spo2")
-        steps_val = latest_h.get("steps")
-        cals = latest_h.get("calories")
-        src = latest_h.get("source", "?")
-
-        if hr:
-            v1.metric("HR", f"{hr:.0f} bpm")
-        if rhr:
-            v2.metric("Ruhe-HR", f"{rhr:.0f} bpm")
-        if hrv:
-            v3.metric("HRV", f"{hrv:.0f} ms")
-        if sleep_dur:
-            v4.metric("Schlaf", f"{sleep_dur / 60:.1f}h")
-
-        v5, v6, v7, _ = st.columns(4)
-        if spo2:
-            v5.metric("SpO2", f"{spo2:.0f}%")
-        if steps_val:
-            v6.metric("Schritte", f"{int(steps_val)}")
-        if cals:
-            v7.metric("Kalorien", f"{cals:.0f} kcal")
-
-        ts_str = latest_h.get("timestamp", "")
-        src_label = {"ha": "Home Assistant", "watch": "Huawei Watch", "manual": "Manuell"}.get(src, src)
-        st.caption(f"Aktualisiert: {ts_str[11:16] if len(ts_str) > 16 else ts_str} | Quelle: {src_label}")
-    else:
-        st.info("Noch keine Daten")
+    @st.fragment
+    def _vitals_page() -> None:
+        import pandas as pd
+        import plotly.graph_objects as go
+
+        st.header("Vitals & Health")
+
+        # Latest snapshot
+        latest_h = api_get("/api/health/latest")
+        if isinstance(latest_h, dict) and latest_h.get("found"):
+            v1, v2, v3, v4 = st.columns(4)
+            hr = latest_h.get("heart_rate")
+            rhr = latest_h.get("resting_hr")
+            hrv = latest_h.get("hrv")
+            sleep_dur = latest_h.get("sleep_duration")
+            spo2 = latest_h.get("spo2")
+            steps_val = latest_h.get("steps")
+            cals = latest_h.get("calories")
+            src = latest_h.get("source", "?")
+
+            if hr:
+                v1.metric("HR", f"{hr:.0f} bpm")
+            if rhr:
+                v2.metric("Ruhe-HR", f"{rhr:.0f} bpm")
+            if hrv:
+                v3.metric("HRV", f"{hrv:.0f} ms")
+            if sleep_dur:
+                v4.metric("Schlaf", f"{sleep_dur / 60:.1f}h")
+
+            v5, v6, v7, _ = st.columns(4)
+            if spo2:
+                v5.metric("SpO2", f"{spo2:.0f}%")
+            if steps_val:
+                v6.metric("Schritte", f"{int(steps_val)}")
+            if cals:
+                v7.metric("Kalorien", f"{cals:.0f} kcal")
+
+            ts_str = latest_h.get("timestamp", "")
+            src_label = {"ha": "Home Assistant", "watch": "Huawei Watch", "manual": "Manuell"}.get(src, src)
+            st.caption(f"Aktualisiert: {ts_str[11:16] if len(ts_str) > 16 else ts_str} | Quelle: {src_label}")
+        else:
+            st.info("Noch keine Daten")
 
-    # Day charts
-    st.divider()
-    date = st.date_input("Tag", value=datetime.now().date(), key="v_date")
-    ds = date.isoformat()
-    health = api_get("/api/health", {"start": f"{ds}T00:00:00", "end": f"{ds}T23:59:59"})
-    if isinstance(health, list) and health:
-        hdf = pd.DataFrame(health)
-        hdf["time"] = pd.to_datetime(hdf["timestamp"])
-        has_source = "source" in hdf.columns
-
-        # Source summary
-        if has_source:
-            src_counts = hdf["source"].value_counts().to_dict()
-            src_parts = []
-            src_names = {"ha": "Home Assistant", "watch": "Huawei Watch", "manual": "Manuell"}
-            for s, c in sorted(src_counts.items()):
-                src_parts.append(f"{src_names.get(s, s)}: {c}")
-            st.caption(f"Datenpunkte: {len(hdf)} ({', '.join(src_parts)})")
-
-        # Color map for sources
-        SRC_COLORS = {"ha": "#F44336", "watch": "#00BCD4", "manual": "#FF9800"}
-
-        h1, h2 = st.columns(2)
-        with h1:
-            if "heart_rate" in hdf.columns and hdf["heart_rate"].notna().any():
-                fig_hr = go.Figure()
-                if has_source:
-                    for src_name, grp in hdf[hdf["heart_rate"].notna()].groupby("source"):
-                        label = {"ha": "HR (HA)", "watch": "HR (Watch)", "manual": "HR (Manuell)"}.get(str(src_name), f"HR ({src_name})")
-                        fig_hr.add_trace(go.Scatter(
-                            x=grp["time"], y=grp["heart_rate"],
+        # Day charts
+        st.divider()
+        dc1, dc2 = st.columns([2, 1])
+        date = dc1.date_input("Tag", value=datetime.now().date(), key="v_date")
+        res = dc2.selectbox("Auflösung", list(VITALS_RESOLUTIONS), key="v_res")
+        rule = VITALS_RESOLUTIONS[res]
+        ds = date.isoformat()
+        health = api_get("/api/health", {"start": f"{ds}T00:00:00", "end": f"{ds}T23:59:59"})
+        if isinstance(health, list) and health:
+            hdf = pd.DataFrame(health)
+            hdf["time"] = pd.to_datetime(hdf["timestamp"], format="ISO8601").dt.as_unit("s")
+            vals = hdf.select_dtypes("number").columns.drop("id", errors="ignore")
+            hdf[vals] = hdf[vals].astype("float32")
+            present = hdf.notna().any()  # one pass: which columns carry any data
+            has_source = "source" in hdf.columns
+
+            # Source summary
+            if has_source:
+                src_counts = hdf["source"].value_counts().to_dict()
+                src_parts = []
+                src_names = {"ha": "Home Assistant", "watch": "Huawei Watch", "manual": "Manuell"}
+                for s, c in sorted(src_counts.items()):
+                    src_parts.append(f"{src_names.get(s, s)}: {c}")
+                st.caption(f"Datenpunkte: {len(hdf)} ({', '.join(src_parts)})")
+
+            # Color map for sources
+            SRC_COLORS = {"ha": "#F44336", "watch": "#00BCD4", "manual": "#FF9800"}
+
+            def _bucket(frame, col, how="mean"):
+                """One column as a time-indexed series, resampled to the chosen resolution."""
+                ser = frame.set_index("time")[col].dropna()
+                return ser if rule is None else getattr(ser.resample(rule), how)().dropna()
+
+            h1, h2 = st.columns(2)
+            with h1:
+                if present.get("heart_rate", False):
+                    fig_hr = go.Figure()
+                    if has_source:
+                        for src_name, grp in hdf[hdf["heart_rate"].notna()].groupby("source"):
+                            label = {"ha": "HR (HA)", "watch": "HR (Watch)", "manual": "HR (Manuell)"}.get(str(src_name), f"HR ({src_name})")
+                            hr_ds = _bucket(grp, "heart_rate")
+                            fig_hr.add_trace(go.Scattergl(
+                                x=hr_ds.index, y=hr_ds.to_numpy(),
+                                mode="lines+markers",
+                                name=label,
+                                line=dict(color=SRC_COLORS.get(str(src_name), "#F44336")),
+                                marker=dict(size=4),
+                            ))
+                    else:
+                        hr_ds = _bucket(hdf, "heart_rate")
+                        fig_hr.add_trace(go.Scattergl(
+                            x=hr_ds.index, y=hr_ds.to_numpy(),
+                            mode="lines+markers", line=dict(color="#F44336"),
+                        ))
+                    fig_hr.update_layout(title="Herzfrequenz", yaxis_title="bpm")
+                    mobile_chart(fig_hr, height=280, key="vitals_hr")
+            with h2:
+                if present.get("hrv", False):
+                    hrv_ds = _bucket(hdf, "hrv")
+                    fig_hrv = go.Figure()
+                    fig_hrv.add_trace(go.Scattergl(
+                        x=hrv_ds.index, y=hrv_ds.to_numpy(),
+                        mode="lines+markers", line=dict(color="#3F51B5"),
+                    ))
+                    fig_hrv.update_layout(title="HRV", yaxis_title="ms")
+                    mobile_chart(fig_hrv, height=280, key="vitals_hrv")
+
+            # Resting HR comparison (watch vs HA)
+            if present.get("resting_hr", False) and has_source:
+                rhr_df = hdf[hdf["resting_hr"].notna()]
+                if len(rhr_df["source"].unique()) > 1:
+                    fig_rhr = go.Figure()
+                    for src_name, grp in rhr_df.groupby("source"):
+                        label = {"ha": "Ruhe-HR (HA)", "watch": "Ruhe-HR (Watch)"}.get(str(src_name), f"Ruhe-HR ({src_name})")
+                        fig_rhr.add_trace(go.Scattergl(
+                            x=grp["time"], y=grp["resting_hr"],
                             mode="lines+markers",
                             name=label,
-                            line=dict(color=SRC_COLORS.get(str(src_name), "#F44336")),
+                            line=dict(color=SRC_COLORS.get(str(src_name), "#9C27B0")),
                             marker=dict(size=4),
                         ))
-                else:
-                    fig_hr.add_trace(go.Scatter(
-                        x=hdf["time"], y=hdf["heart_rate"],
-                        mode="lines+markers", line=dict(color="#F44336"),
-                    ))
-                fig_hr.update_layout(title="Herzfrequenz", yaxis_title="bpm")
-                mobile_chart(fig_hr, height=280)
-        with h2:
-            if "hrv" in hdf.columns and hdf["hrv"].notna().any():
-                fig_hrv = go.Figure()
-                fig_hrv.add_trace(go.Scatter(
-                    x=hdf["time"], y=hdf["hrv"],
-                    mode="lines+markers", line=dict(color="#3F51B5"),
-                ))
-                fig_hrv.update_layout(title="HRV", yaxis_title="ms")
-                mobile_chart(fig_hrv, height=280)
-
-        # Resting HR comparison (watch vs HA)
-        if "resting_hr" in hdf.columns and hdf["resting_hr"].notna().any() and has_source:
-            rhr_df = hdf[hdf["resting_hr"].notna()]
-            if len(rhr_df["source"].unique()) > 1:
-                fig_rhr = go.Figure()
-                for src_name, grp in rhr_df.groupby("source"):
-                    label = {"ha": "Ruhe-HR (HA)", "watch": "Ruhe-HR (Watch)"}.get(str(src_name), f"Ruhe-HR ({src_name})")
-                    fig_rhr.add_trace(go.Scatter(
-                        x=grp["time"], y=grp["resting_hr"],
+                    fig_rhr.update_layout(title="Ruhe-Herzfrequenz (Vergleich)", yaxis_title="bpm")
+                    mobile_chart(fig_rhr, height=250, key="vitals_rhr")
+
+            if present.get("steps", False):
+                # Steps are a cumulative day count, so a bucket keeps its max.
+                steps_ds = _bucket(hdf, "steps", "max")
+                if not steps_ds.empty:
+                    fig_steps = go.Figure()
+                    fig_steps.add_trace(go.Scattergl(
+                        x=steps_ds.index, y=steps_ds.to_numpy(),
                         mode="lines+markers",
-                        name=label,
-                        line=dict(color=SRC_COLORS.get(str(src_name), "#9C27B0")),
+                        line=dict(color="#4CAF50", width=2),
                         marker=dict(size=4),
+                        fill="tozeroy",
+                        fillcolor="rgba(76,175,80,0.08)",
+                        name="Schritte",
                     ))
-                fig_rhr.update_layout(title="Ruhe-Herzfrequenz (Vergleich)", yaxis_title="bpm")
-                mobile_chart(fig_rhr, height=250)
-
-        if "steps" in hdf.columns and hdf["steps"].notna().any():
-            # Show steps as line graph; drop midnight carryover artefacts by
-            # only keeping rows where steps changed from the previous snapshot
-            steps_df = hdf[hdf["steps"].notna()].copy()
-            if not steps_df.empty:
-                fig_steps = go.Figure()
-                fig_steps.add_trace(go.Scatter(
-                    x=steps_df["time"], y=steps_df["steps"],
-                    mode="lines+markers",
-                    line=dict(color="#4CAF50", width=2),
-                    marker=dict(size=4),
-                    fill="tozeroy",
-                    fillcolor="rgba(76,175,80,0.08)",
-                    name="Schritte",
-                ))
-                fig_steps.update_layout(title="Schritte", yaxis_title="Steps")
-                mobile_chart(fig_steps, height=250)
-    else:
-        st.info("Keine Daten für diesen Tag")
+                    fig_steps.update_layout(title="Schritte", yaxis_title="Steps")
+                    mobile_chart(fig_steps, height=250, key="vitals_steps")
+        else:
+            st.info("Keine Daten für diesen Tag")
+
+    _vitals_page()
 
 
 # =========================================================
 # PAGE: Persönliches Modell
 # =========================================================
 elif current_page == "modell":
-    st.header("Persönliches Modell")
-    st.caption(
-        "Analysiert deine Fokus-Ratings relativ zu Elvanse-Einnahmen. "
-        "Je mehr Daten, desto präziser die persönliche Wirkungskurve."
-    )
+    @st.fragment
+    def _modell_page() -> None:
+        import pandas as pd
+        import plotly.graph_objects as go
+
+        st.header("Persönliches Modell")
+        st.caption(
+            "Analysiert deine Fokus-Ratings relativ zu Elvanse-Einnahmen. "
+            "Je mehr Daten, desto präziser die persönliche Wirkungskurve."
+        )
+
+        model_data = api_get("/api/model/fit")
+
+        if isinstance(model_data, dict):
+            ms = model_data.get("status", "error")
+            pc = model_data.get("pairs", 0)
+            req = model_data.get("required", 15)
 
-    model_data = api_get("/api/model/fit")
-
-    if isinstance(model_data, dict):
-        ms = model_data.get("status", "error")
-        pc = model_data.get("pairs", 0)
-        req = model_data.get("required", 15)
-
-        st.progress(min(pc / max(req, 1), 1.0), text=f"Datenpunkte: {pc}/{req}")
-
-        collected = model_data.get("collected_pairs", [])
-
-        if ms == "insufficient_data":
-            st.warning(model_data.get("message", "Nicht genug Daten."))
-
-        elif ms == "ok":
-            st.success("Modell berechnet!")
-            r1, r2, r3 = st.columns(3)
-            r1.metric("Korrelation", f"{model_data.get('correlation', 0):.2f}")
-            r2.metric("Peak", f"{model_data.get('personal_peak_offset_h', '?')}h")
-            thr = model_data.get("personal_threshold")
-            r3.metric("Schwelle", f"{thr:.2f}" if thr else "?")
-            st.info(model_data.get("recommendation", ""))
-
-        # Plot data regardless of status (as long as we have pairs)
-        if collected:
-            cpdf = pd.DataFrame(collected).sort_values("offset_h")
-
-            fig_m = go.Figure()
-
-            # Scatter: individual focus ratings
-            fig_m.add_trace(go.Scatter(
-                x=cpdf["offset_h"], y=cpdf["focus"],
-                mode="markers",
-                marker=dict(size=10, color="#2196F3", opacity=0.7),
-                name="Fokus-Rating",
-            ))
-
-            # Smooth model curve from predicted_level
-            if "predicted_level" in cpdf.columns:
-                # Sort and use line to get a proper curve
-                fig_m.add_trace(go.Scatter(
-                    x=cpdf["offset_h"],
-                    y=cpdf["predicted_level"].apply(lambda x: x * 10),
-                    mode="lines",
-                    line=dict(color="#FF9800", width=2, shape="spline"),
-                    name="Modell-Kurve (×10)",
+            st.progress(min(pc / max(req, 1), 1.0), text=f"Datenpunkte: {pc}/{req}")
+
+            collected = model_data.get("collected_pairs", [])
+
+            if ms == "insufficient_data":
+                st.warning(model_data.get("message", "Nicht genug Daten."))
+
+            elif ms == "ok":
+                st.success("Modell berechnet!")
+                r1, r2, r3 = st.columns(3)
+                r1.metric("Korrelation", f"{model_data.get('correlation', 0):.2f}")
+                r2.metric("Peak", f"{model_data.get('personal_peak_offset_h', '?')}h")
+                thr = model_data.get("personal_threshold")
+                r3.metric("Schwelle", f"{thr:.2f}" if thr else "?")
+                st.info(model_data.get("recommendation", ""))
+
+            # Plot data regardless of status (as long as we have pairs)
+            if collected:
+                # Fixed columns: a pair without predicted_level just yields NaN
+                cpdf = pd.DataFrame(collected, columns=["offset_h", "focus", "predicted_level"]).sort_values("offset_h")
+
+                fig_m = go.Figure()
+
+                # Scatter: individual focus ratings
+                fig_m.add_trace(go.Scattergl(
+                    x=cpdf["offset_h"], y=cpdf["focus"],
+                    mode="markers",
+                    marker=dict(size=10, color="#2196F3", opacity=0.7),
+                    name="Fokus-Rating",
                 ))
 
-            if ms == "ok" and model_data.get("personal_threshold"):
-                fig_m.add_hline(
-                    y=7,
-                    line=dict(color="#4CAF50", width=1, dash="dash"),
-                    annotation_text="Fokus ≥ 7",
-                )
+                # Smooth model curve from predicted_level (sorted by offset above);
+                # skipped when the API sent no levels, instead of an all-NaN trace
+                predicted = pd.to_numeric(cpdf["predicted_level"], errors="coerce")
+                if predicted.notna().any():
+                    fig_m.add_trace(go.Scattergl(
+                        x=cpdf["offset_h"],
+                        y=predicted * 10,
+                        mode="lines",
+                        line=dict(color="#FF9800", width=2, shape="spline"),
+                        name="Modell-Kurve (×10)",
+                    ))
 
-            fig_m.update_layout(
-                xaxis_title="Stunden nach Elvanse",
-                yaxis_title="Fokus / Level ×10",
-                yaxis=dict(range=[0, 11]),
-            )
-            mobile_chart(fig_m, height=400)
-
-            with st.expander("Datenpunkte"):
-                st.dataframe(
-                    cpdf[["offset_h", "focus", "predicted_level"]].rename(columns={
-                        "offset_h": "Stunden nach ELV",
-                        "focus": "Fokus",
-                        "predicted_level": "Modell-Level",
-                    }),
-                    use_container_width=True,
+                if ms == "ok" and model_data.get("personal_threshold"):
+                    fig_m.add_hline(
+                        y=7,
+                        line=dict(color="#4CAF50", width=1, dash="dash"),
+                        annotation_text="Fokus ≥ 7",
+                    )
+
+                fig_m.update_layout(
+                    xaxis_title="Stunden nach Elvanse",
+                    yaxis_title="Fokus / Level ×10",
+                    yaxis=dict(range=[0, 11]),
                 )
+                mobile_chart(fig_m, height=400, key="modell_fit")
+
+                with st.expander("Datenpunkte"):
+                    st.dataframe(
+                        cpdf[["offset_h", "focus", "predicted_level"]].rename(columns={
+                            "offset_h": "Stunden nach ELV",
+                            "focus": "Fokus",
+                            "predicted_level": "Modell-Level",
+                        }),
+                        use_container_width=True,
+                    )
+
+    _modell_page()
 
 
 # =========================================================
 # PAGE: Korrelation
 # =========================================================
 elif current_page == "korrelation":
-    st.header("Korrelationsanalyse")
-
-    days_back = st.slider("Tage zurück", 7, 90, 30, key="corr_d")
-    now_ts = datetime.now()
-    start = (now_ts - timedelta(days=days_back)).isoformat()
-    end = now_ts.isoformat()
-
-    intakes_corr = api_get("/api/intake", {"start": start, "end": end})
-    logs_corr = api_get("/api/log", {"start": start, "end": end})
-    health_corr = api_get("/api/health", {"start": start, "end": end})
+    @st.fragment
+    def _korrelation_page() -> None:
+        import numpy as np
+        import pandas as pd
+        import plotly.graph_objects as go
+
+        st.header("Korrelationsanalyse")
+
+        days_back = st.slider("Tage zurück", 7, 90, 30, key="corr_d")
+        # Whole-day bounds keep the cache key stable between reruns (a now()
+        # timestamp would change every time and never hit the cache).
+        now_ts = datetime.now()
+        start = (now_ts - timedelta(days=days_back)).strftime("%Y-%m-%dT00:00:00")
+        end = now_ts.strftime("%Y-%m-%dT23:59:59")
+        rng = {"start": start, "end": end}
+
+        intakes_corr, logs_corr, health_corr = api_get_many(
+            ("/api/intake", rng), ("/api/log", rng), ("/api/health", rng), ttl=60,
+        )
 
-    if not isinstance(intakes_corr, list) or not isinstance(logs_corr, list):
-        st.warning("Nicht genügend Daten")
-    else:
-        c1, c2 = st.columns(2)
-        with c1:
-            st.subheader("Elvanse vs. Fokus")
-            pairs = []
-            ei_list = [i for i in intakes_corr if i.get("substance") == "elvanse"]
-            for lg in logs_corr:
-                lt = datetime.fromisoformat(lg["timestamp"])
-                foc = lg.get("focus")
-                if foc is None:
-                    continue
-                best = None
-                for ei in ei_list:
-                    et = datetime.fromisoformat(ei["timestamp"])
-                    off = (lt - et).total_seconds() / 3600
-                    if 0 <= off <= 16:
-                        if best is None or off < best:
-                            best = off
-                if best is not None:
-                    pairs.append({"offset_h": best, "focus": foc})
-
-            if pairs:
-                pairs_df = pd.DataFrame(pairs)
-                fig_c = go.Figure()
-                fig_c.add_trace(go.Scatter(
-                    x=pairs_df["offset_h"], y=pairs_df["focus"],
-                    mode="markers",
-                    marker=dict(size=8, color="#2196F3", opacity=0.7),
-                ))
-                fig_c.update_layout(xaxis_title="h nach Elvanse", yaxis_title="Fokus")
-                mobile_chart(fig_c, height=350)
-            else:
-                st.info("Noch keine Paare")
-
-        with c2:
-            st.subheader("Schlaf vs. Fokus")
-            if isinstance(health_corr, list) and health_corr:
-                sbd = {}
-                for h in health_corr:
-                    d_key = h["timestamp"][:10]
-                    sd = h.get("sleep_duration")
-                    if sd:
-                        sbd[d_key] = sd
-                sfp = []
-                for lg in logs_corr:
-                    ld = lg["timestamp"][:10]
-                    pd_day = (datetime.fromisoformat(ld) - timedelta(days=1)).strftime("%Y-%m-%d")
-                    foc = lg.get("focus")
-                    if foc and pd_day in sbd:
-                        sfp.append({"sleep_h": sbd[pd_day] / 60, "focus": foc})
-                if sfp:
-                    sdf = pd.DataFrame(sfp)
-                    fig_s = go.Figure()
-                    fig_s.add_trace(go.Scatter(
-                        x=sdf["sleep_h"], y=sdf["focus"],
+        if not isinstance(intakes_corr, list) or not isinstance(logs_corr, list):
+            st.warning("Nicht genügend Daten")
+        else:
+            # Parse all timestamps once, vectorized (cache=True dedupes repeats).
+            idf = pd.DataFrame(intakes_corr, columns=["timestamp", "substance"])
+            ldf = pd.DataFrame(logs_corr, columns=["timestamp", "focus"])
+            idf["ts"] = pd.to_datetime(idf["timestamp"], format="ISO8601", cache=True)
+            ldf["ts"] = pd.to_datetime(ldf["timestamp"], format="ISO8601", cache=True)
+
+            c1, c2 = st.columns(2)
+            with c1:
+                st.subheader("Elvanse vs. Fokus")
+                # Pair each log with the latest Elvanse intake at or before it
+                # (the smallest non-negative offset), kept if within 16 h.
+                ei_ts = np.sort(idf.loc[idf["substance"] == "elvanse", "ts"].to_numpy("datetime64[ns]"))
+                fl = ldf[ldf["focus"].notna()]
+                log_ts = fl["ts"].to_numpy("datetime64[ns]")
+                pairs_df = pd.DataFrame(columns=["offset_h", "focus"], dtype=float)
+                if ei_ts.size and log_ts.size:
+                    idx = np.searchsorted(ei_ts, log_ts, side="right") - 1
+                    off_h = (log_ts - ei_ts[np.maximum(idx, 0)]) / np.timedelta64(1, "h")
+                    m = (idx >= 0) & (off_h <= 16)
+                    pairs_df = pd.DataFrame({"offset_h": off_h[m], "focus": fl["focus"].to_numpy()[m]})
+
+                if not pairs_df.empty:
+                    fig_c = go.Figure()
+                    fig_c.add_trace(go.Scattergl(
+                        x=pairs_df["offset_h"], y=pairs_df["focus"],
                         mode="markers",
-                        marker=dict(size=8, color="#4CAF50", opacity=0.7),
+                        marker=dict(size=8, color="#2196F3", opacity=0.7),
                     ))
-                    fig_s.update_layout(xaxis_title="Schlaf (h Vornacht)", yaxis_title="Fokus")
-                    mobile_chart(fig_s, height=350)
+                    fig_c.update_layout(xaxis_title="h nach Elvanse", yaxis_title="Fokus")
+                    mobile_chart(fig_c, height=350, key="korr_elvanse")
                 else:
                     st.info("Noch keine Paare")
-            else:
-                st.info("Keine Health-Daten")
 
-        st.divider()
-        mc1, mc2, mc3 = st.columns(3)
-        mc1.metric("Einnahmen", len(intakes_corr) if isinstance(intakes_corr, list) else 0)
-        mc2.metric("Logs", len(logs_corr) if isinstance(logs_corr, list) else 0)
-        mc3.metric("Health", len(health_corr) if isinstance(health_corr, list) else 0)
+            with c2:
+                st.subheader("Schlaf vs. Fokus")
+                if isinstance(health_corr, list) and health_corr:
+                    # Last non-zero sleep duration per day, joined to each log's previous day.
+                    hdf = pd.DataFrame(health_corr, columns=["timestamp", "sleep_duration"])
+                    hdf["d"] = hdf["timestamp"].str[:10]
+                    sleep_by_day = (
+                        hdf[hdf["sleep_duration"].fillna(0) != 0]
+                        .groupby("d", as_index=False)["sleep_duration"].last()
+                    )
+                    fl = ldf[ldf["focus"].fillna(0) != 0]
+                    fl = fl.assign(d=(fl["ts"].dt.normalize() - pd.Timedelta(days=1)).dt.strftime("%Y-%m-%d"))
+                    merged = fl.merge(sleep_by_day, on="d")
+                    sdf = pd.DataFrame({"sleep_h": merged["sleep_duration"] / 60, "focus": merged["focus"]})
+                    if not sdf.empty:
+                        fig_s = go.Figure()
+                        fig_s.add_trace(go.Scattergl(
+                            x=sdf["sleep_h"], y=sdf["focus"],
+                            mode="markers",
+                            marker=dict(size=8, color="#4CAF50", opacity=0.7),
+                        ))
+                        fig_s.update_layout(xaxis_title="Schlaf (h Vornacht)", yaxis_title="Fokus")
+                        mobile_chart(fig_s, height=350, key="korr_sleep")
+                    else:
+                        st.info("Noch keine Paare")
+                else:
+                    st.info("Keine Health-Daten")
+
+            st.divider()
+            mc1, mc2, mc3 = st.columns(3)
+            mc1.metric("Einnahmen", len(intakes_corr) if isinstance(intakes_corr, list) else 0)
+            mc2.metric("Logs", len(logs_corr) if isinstance(logs_corr, list) else 0)
+            mc3.metric("Health", len(health_corr) if isinstance(health_corr, list) else 0)
+
+    _korrelation_page()
 
 
 # =========================================================
 # PAGE: System
 # =========================================================
 elif current_page == "system":
-    st.header("System")
-
-    status_data = api_get("/api/status")
-    if isinstance(status_data, dict):
-        sc1, sc2 = st.columns(2)
-        sc1.metric("Service", status_data.get("service", "?"))
-        sc2.metric("Status", status_data.get("status", "?"))
-        st.caption(f"Server: {status_data.get('timestamp', '?')}")
-
-        ui = status_data.get("user", {})
-        if ui:
-            uc1, uc2, uc3, uc4 = st.columns(4)
-            uc1.metric("Gewicht", f"{ui.get('weight_kg', '?')} kg")
-            uc2.metric("Größe", f"{ui.get('height_cm', '?')} cm")
-            uc3.metric("Alter", f"{ui.get('age', '?')}")
-            uc4.metric("Fasten", "Ja" if ui.get("fasting") else "Nein")
+    @st.fragment
+    def _system_page() -> None:
+        st.header("System")
+
+        status_data = api_get("/api/status")
+        if isinstance(status_data, dict):
+            sc1, sc2 = st.columns(2)
+            sc1.metric("Service", status_data.get("service", "?"))
+            sc2.metric("Status", status_data.get("status", "?"))
+            st.caption(f"Server: {status_data.get('timestamp', '?')}")
+
+            ui = status_data.get("user", {})
+            if ui:
+                uc1, uc2, uc3, uc4 = st.columns(4)
+                uc1.metric("Gewicht", f"{ui.get('weight_kg', '?')} kg")
+                uc2.metric("Größe", f"{ui.get('height_cm', '?')} cm")
+                uc3.metric("Alter", f"{ui.get('age', '?')}")
+                uc4.metric("Fasten", "Ja" if ui.get("fasting") else "Nein")
 
-    st.divider()
-    st.subheader("Letzte Einnahmen")
-    for sn, sl in [("elvanse", "Elvanse"), ("medikinet", "Medikinet IR"), ("medikinet_retard", "Med. retard")]:
-        lat = api_get("/api/intake/latest", {"substance": sn})
-        if isinstance(lat, dict) and lat.get("found"):
-            ts_val = lat.get("timestamp", "?")
-            dose_val = lat.get("dose_mg", "?")
-            try:
-                it = datetime.fromisoformat(ts_val)
-                hrs = (datetime.now() - it).total_seconds() / 3600
-                st.text(f"{sl}: {dose_val}mg — vor {hrs:.1f}h ({ts_val[11:16]})")
-            except Exception:
-                st.text(f"{sl}: {dose_val}mg @ {ts_val}")
-        else:
-            st.text(f"{sl}: —")
+        st.divider()
+        st.subheader("Letzte Einnahmen")
+        latest = api_get("/api/intake/latest-batch", {"substances": ",".join(sn for sn, _ in LATEST_SUBSTANCES)})
+        latest_rows = []
+        for sn, sl in LATEST_SUBSTANCES:
+            lat = latest.get(sn) if isinstance(latest, dict) else None
+            if isinstance(lat, dict) and lat.get("found"):
+                ts_val = lat.get("timestamp", "?")
+                hrs = lat.get("hours_ago")
+                latest_rows.append({
+                    "Substanz": sl,
+                    "Dosis": f"{lat.get('dose_mg', '?')}mg",
+                    "Zeit": ts_val[11:16] if hrs is not None else ts_val,
+                    "Vor": f"{hrs:.1f}h" if hrs is not None else "—",
+                })
+            else:
+                latest_rows.append({"Substanz": sl, "Dosis": "—", "Zeit": "—", "Vor": "—"})
+        # One table element instead of one st.text per row
+        st.table(latest_rows)
 
-    st.divider()
-    st.subheader("Log-Zeitplan")
-    rem = api_get("/api/log-reminder")
-    if isinstance(rem, dict):
-        sch = rem.get("schedule", [])
-        for s in sch:
-            icon = "[x]" if s["status"] == "done" else (">>>" if s["status"] == "due" else "[ ]")
-            label = s.get("label", "?")
-            target = s.get("target_time", "?")
-            st.text(f"{icon} {target} — {label}")
+        st.divider()
+        st.subheader("Log-Zeitplan")
+        rem = api_get("/api/log-reminder")
+        if isinstance(rem, dict):
+            sch = rem.get("schedule", [])
+            if sch:
+                st.table([
+                    {
+                        "": {"done": "[x]", "due": ">>>"}.get(s["status"], "[ ]"),
+                        "Zeit": s.get("target_time", "?"),
+                        "Log": s.get("label", "?"),
+                    }
+                    for s in sch
+                ])
 
-        st.caption(
-            "Zeitplan richtet sich nach Elvanse-Einnahme: Baseline (15 Min vor), "
-            "dann +1.5h (Onset), +4h (Peak), +8h (Decline), 22:00 (Vor Schlafen). "
-            "Ohne Elvanse: feste Zeiten (09:00, 12:00, 15:00, 18:00, 21:00)."
-        )
+            st.caption(
+                "Zeitplan richtet sich nach Elvanse-Einnahme: Baseline (15 Min vor), "
+                "dann +1.5h (Onset), +4h (Peak), +8h (Decline), 22:00 (Vor Schlafen). "
+                "Ohne Elvanse: feste Zeiten (09:00, 12:00, 15:00, 18:00, 21:00)."
+            )
 
-    st.divider()
-    st.code(f"API: {API_BASE}\nKey: {'***' + API_KEY[-4:] if len(API_KEY) > 4 else '(nicht gesetzt)'}")
\ No newline at end of file
+        st.divider()
+        st.code(f"API: {API_BASE}\nKey: {'***' + API_KEY[-4:] if len(API_KEY) > 4 else '(nicht gesetzt)'}")
+
+    _system_page()
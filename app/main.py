@@ -10,6 +10,7 @@ from contextlib import asynccontextmanager
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
 from app.config import HA_POLL_INTERVAL_SEC, HA_TOKEN
 from app.core.database import init_db
@@ -73,6 +74,8 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Curve/bootstrap payloads are tens of KB of JSON; compress them for remote dashboards
+app.add_middleware(GZipMiddleware, minimum_size=1024)
 
 app.include_router(router)
 
@@ -0,0 +1,34 @@
+"""The water bootstrap payload must stay JSON-serialisable for Starlette."""
+
+import json
+from datetime import datetime
+
+import pytest
+
+from app.core import database
+
+
+@pytest.fixture
+def water_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(database, "DB_PATH", tmp_path / "bio.db")
+    monkeypatch.setattr(database._local, "conn", None, raising=False)
+    with database.db_cursor() as cur:
+        cur.executescript(database.SCHEMA_SQL)
+    yield
+    database._local.conn.close()
+    database._local.conn = None
+
+
+def test_bootstrap_serialises_with_malformed_timestamp(water_db):
+    routes = pytest.importorskip("app.api.routes")
+    today = datetime.now().strftime("%Y-%m-%d")
+    database.insert_water_event(250, "manual", timestamp=f"{today}T08:00:00")
+    database.insert_water_event(300, "manual", timestamp=f"{today}T12:xx")
+
+    events = database.get_todays_water_events()
+    payload = routes._water_bootstrap(30, 7, events)
+
+    # JSONResponse encodes with allow_nan=False; a NaN anywhere is a 500
+    json.dumps(payload, allow_nan=False, default=str)
+    assert all(not k.startswith("_") for ev in payload["intake_today"] for k in ev)
+    assert payload["status"]["intake_ml"] == 550